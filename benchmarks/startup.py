@@ -0,0 +1,100 @@
+"""Startup benchmark: time to the main menu for small and large rosters.
+
+Each run starts a fresh interpreter that imports the application,
+builds an AppController and lists the tournaments, which is what the
+menu does before its first prompt. Startup should not depend on the
+size of players.json, since the roster is only read when first needed.
+
+Usage: python benchmarks/startup.py [--runs 5] [--sizes 100 100000]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+# Code timed in the child process, from the first import to the listing.
+CHILD = """
+import time
+start = time.perf_counter()
+from controllers.app_controller import AppController
+app = AppController()
+app.get_tournament_files()
+print(time.perf_counter() - start)
+"""
+
+
+def write_data(data_dir: Path, num_players: int, num_tournaments: int) -> None:
+    """
+    Write a roster and empty tournaments in a data directory.
+
+    Args:
+        data_dir: Directory used as CHESS_DATA_DIR
+        num_players: Number of players in players.json
+        num_tournaments: Number of tournament files
+    """
+    tournaments = data_dir / "tournaments"
+    tournaments.mkdir(parents=True)
+    players = [{"last_name": f"Nom{i}", "first_name": f"Prénom{i}",
+                "birth_date": "01/01/2000", "national_id": f"AB{i:07d}",
+                "rating": 1000 + i % 1500} for i in range(num_players)]
+    (data_dir / "players.json").write_text(json.dumps(players),
+                                           encoding="utf-8")
+    for i in range(num_tournaments):
+        name = f"Open{i}_01-01-2026"
+        (tournaments / f"{name}.json").write_text(json.dumps({
+            "name": f"Open{i}", "location": "Paris",
+            "start_date": "01-01-2026", "end_date": "02-01-2026",
+            "num_rounds": 4, "current_round": 0, "rounds": [],
+            "players": [], "description": ""}), encoding="utf-8")
+
+
+def time_startup(data_dir: Path, runs: int) -> list:
+    """
+    Time the startup in fresh interpreters.
+
+    Args:
+        data_dir: Directory used as CHESS_DATA_DIR
+        runs: Number of interpreters to start
+
+    Returns:
+        Startup time of each run, in seconds
+    """
+    # Extra paths are kept, so optional packages installed there count.
+    path = os.pathsep.join(filter(None, [str(ROOT),
+                                         os.environ.get("PYTHONPATH")]))
+    env = dict(os.environ, CHESS_DATA_DIR=str(data_dir), PYTHONPATH=path)
+    env.pop("CHESS_METRICS", None)
+    times = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", CHILD], cwd=ROOT,
+                                env=env, capture_output=True, text=True,
+                                check=True)
+        times.append(float(result.stdout.strip().splitlines()[-1]))
+    return times
+
+
+def main() -> None:
+    """Run the benchmark and print one line per roster size."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 100000])
+    parser.add_argument("--tournaments", type=int, default=20)
+    args = parser.parse_args()
+    print(f"{'players':>10} {'median ms':>10} {'min ms':>10} {'max ms':>10}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            write_data(Path(tmp), size, args.tournaments)
+            times = [t * 1000 for t in time_startup(Path(tmp), args.runs)]
+        print(f"{size:>10} {statistics.median(times):>10.1f} "
+              f"{min(times):>10.1f} {max(times):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,17 @@
 """Application controller for main application flow."""
 
-from models.classes import Tournament
-from typing import Optional
-from storage.save import save_tournament, load_tournament, list_tournament_files
+from models.classes import (Tournament, SWISS, ROUND_ROBIN,
+                            DOUBLE_ROUND_ROBIN, SCHEVENINGEN)
+from typing import List, Optional, Tuple
+from storage.save import (save_tournament, load_tournament,
+                          list_tournament_files, storage_lock,
+                          refresh_tournament)
 from controllers.player_controller import PlayerController
 from controllers.tournament_controller import TournamentController
+from controllers.simulation_controller import SimulationController
+from controllers.result_entry_controller import ResultEntryController
+from storage.export import export_archive
+from storage.verify import verify_archive
 from views.view import MainView
 
 
@@ -41,6 +48,8 @@ class AppController:
         """Initialize the application controller."""
         self.player_controller = PlayerController()
         self.tournament_controller = TournamentController()
+        self.simulation_controller = SimulationController()
+        self.live_controller = None
         self.view = MainView()
 
     def handle_add_player(self):
@@ -49,13 +58,20 @@ class AppController:
             if nid in self.player_controller.get_all_players():
                 print("Ce joueur existe déjà.")
                 return
-            if not self.validate_national_id(nid):
+            if not self.view.validate_national_id(nid):
                 print("Format d'identifiant invalide.")
                 return
             last = input("Nom de famille: ").strip()
             first = input("Prénom: ").strip()
             birth = input("Date de naissance (JJ/MM/AAAA): ").strip()
-            if self.player_controller.add_player(nid, last, first, birth):
+            rating = input("Classement Elo (optionnel): ").strip()
+            try:
+                rating = int(rating) if rating else None
+            except ValueError:
+                print("Classement invalide.")
+                return
+            if self.player_controller.add_player(nid, last, first, birth,
+                                                 rating):
                 print("Joueur ajouté.")
             else:
                 print("Erreur lors de l'ajout du joueur.")
@@ -84,6 +100,16 @@ class AppController:
             if not self.register_player_to_tournament(
                     tournament, nid):
                 print("ID inconnu, ajoutez d'abord le joueur.")
+        system = input("Système (1 suisse, 2 toutes rondes, "
+                       "3 double toutes rondes, 4 scheveningen) [1]: ").strip()
+        systems = {"": SWISS, "1": SWISS, "2": ROUND_ROBIN,
+                   "3": DOUBLE_ROUND_ROBIN, "4": SCHEVENINGEN}
+        try:
+            self.tournament_controller.configure_schedule(
+                tournament, systems[system]
+            )
+        except (KeyError, ValueError) as e:
+            print(f"Système invalide, suisse conservé ({e}).")
         print("Tournoi créé et sauvegardé.")
         
     def handle_list_tournaments(self):
@@ -102,7 +128,7 @@ class AppController:
         Returns:
             Tournament instance or None if loading failed
         """
-        files = self.app_controller.get_tournament_files()
+        files = self.get_tournament_files()
         if not files:
             print("Aucun tournoi trouvé.")
             return None
@@ -112,7 +138,7 @@ class AppController:
         sel = input("Numéro du fichier à charger: ").strip()
         try:
             idx = int(sel)
-            return self.app_controller.load_tournament_by_index(idx)
+            return self.load_tournament_by_index(idx)
         except (ValueError, IndexError):
             print("Sélection invalide.")
             return None
@@ -125,11 +151,17 @@ class AppController:
         Args:
             tournament: Tournament instance
         """
+        if self.live_controller is not None:
+            self.live_controller.track(tournament)
         while True:
+            if refresh_tournament(tournament):
+                print("Tournoi mis à jour depuis un autre terminal.")
             self.view.print_tournament_menu(tournament)
             sub = input("Choix: ").strip()
             if sub == "1":
                 self.view.display_tournament_players(tournament)
+            elif sub in ("2", "3") and tournament.sections:
+                self.handle_generate_sections_round(tournament)
             elif sub == "2":
                 try:
                     rnd = self.tournament_controller.generate_round_one(tournament)
@@ -144,40 +176,231 @@ class AppController:
                     print(f"{rnd.name} créé.")
                 except RuntimeError as e:
                     print(f"Erreur: {e}")
+            elif sub == "4" and tournament.sections:
+                for section in tournament.sections:
+                    print(f"== Section {section.name} ==")
+                    self.view.display_rounds_and_matches(section)
             elif sub == "4":
                 self.view.display_rounds_and_matches(tournament)
             elif sub == "5":
-                try:
-                    ridx = int(input("Index du round: ").strip())
-                    if ridx < 0 or ridx >= len(tournament.rounds):
-                        print("Index invalide.")
-                        continue
-                    rnd = tournament.rounds[ridx]
-                    scores_map = {}
-                    for gi, game in enumerate(rnd.games):
-                        p1, p2 = game[0][0], game[1][0]
-                        if p1 == "BYE" or p2 == "BYE":
-                            print(f"{gi}: BYE match ({p1} vs {p2}) - "
-                                  "déjà attribué")
-                            continue
-                        s1 = float(input(f"Score {p1}: ").strip())
-                        s2 = float(input(f"Score {p2}: ").strip())
-                        scores_map[gi] = (s1, s2)
-                    self.tournament_controller.enter_scores_for_round(
-                        tournament, ridx, scores_map
+                self.handle_enter_results(tournament)
+            elif sub == "6" and tournament.sections:
+                for section in tournament.sections:
+                    points = self.tournament_controller.compute_tournament_points(
+                        section
                     )
-                    print("Scores enregistrés.")
-                except (ValueError, IndexError) as e:
-                    print(f"Erreur: {e}")
+                    self.view.display_section_standings(section.name, points)
             elif sub == "6":
                 self.view.display_tournament_points(tournament)
             elif sub == "7":
                 self.save_tournament(tournament)
                 print("Sauvegardé.")
                 break
+            elif sub == "8":
+                self.handle_add_section(tournament)
+            elif sub == "9":
+                self.handle_simulation(tournament)
+            elif sub == "10":
+                if self.tournament_controller.undo(tournament):
+                    print("Dernière modification annulée.")
+                else:
+                    print("Rien à annuler.")
+            elif sub == "11":
+                if self.tournament_controller.redo(tournament):
+                    print("Modification rétablie.")
+                else:
+                    print("Rien à rétablir.")
+            elif sub == "12":
+                self.handle_rollback(tournament)
             else:
                 print("Choix invalide.")
 
+    def handle_enter_results(self, tournament: Tournament):
+        """
+        Handle entering the results of a round with one-line codes.
+
+        Accepted lines are journaled at once, so an interrupted entry
+        resumes where it stopped; the tournament is saved on validation.
+
+        Args:
+            tournament: Tournament instance
+        """
+        try:
+            section_name = None
+            if tournament.sections:
+                section_name = input("Section: ").strip()
+            ridx = int(input("Index du round: ").strip())
+            entry = ResultEntryController(self.tournament_controller,
+                                          tournament, ridx, section_name)
+        except KeyError as e:
+            print(f"Section inconnue: {e}")
+            return
+        except (ValueError, IndexError):
+            print("Index invalide.")
+            return
+        if entry.results:
+            print(f"Reprise de la saisie: {len(entry.results)} résultat(s) "
+                  "déjà saisi(s).")
+        self.view.print_result_entry_help()
+        board = entry.next_board()
+        while True:
+            if board is None:
+                line = input("Tous les résultats sont saisis. Valider ? "
+                             "(O/n, ou N:code pour corriger): ").strip()
+                if line.lower() in ("", "o"):
+                    line = "v"
+                elif line.lower() == "n":
+                    line = "p"
+            else:
+                white, black = entry.games[board][0][0], entry.games[board][1][0]
+                line = input(f"[{len(entry.pending())} restant(s)] "
+                             f"Échiquier {board}: {white} - {black} > ").strip()
+            if line.lower() == "v":
+                count = entry.commit()
+                print(f"{count} résultat(s) enregistré(s).")
+                if entry.stale:
+                    print("Appariement modifié entre-temps, résultat ignoré "
+                          "pour l'échiquier: "
+                          + ", ".join(str(b) for b in sorted(entry.stale)))
+                return
+            if line.lower() == "p":
+                print("Saisie interrompue, elle reprendra au même point.")
+                return
+            if line.lower() == "a":
+                entry.discard()
+                print("Saisie abandonnée.")
+                return
+            if not line:
+                board = entry.next_board(board + 1)
+                continue
+            try:
+                boards = entry.enter_line(line, board or 0)
+            except ValueError as e:
+                print(f"Erreur: {e} Ligne ignorée.")
+                continue
+            board = entry.next_board(max(boards) + 1 if boards else board)
+
+    def handle_rollback(self, tournament: Tournament):
+        """
+        Handle rolling a tournament or section back to an earlier round.
+
+        Args:
+            tournament: Tournament instance
+        """
+        try:
+            section_name = None
+            if tournament.sections:
+                section_name = input("Section: ").strip()
+            count = int(input("Nombre de rounds à conserver: ").strip())
+            self.tournament_controller.rollback_to_round(
+                tournament, count, section_name
+            )
+            print(f"Retour au round {count}. (Annulable avec l'option 10)")
+        except KeyError as e:
+            print(f"Section inconnue: {e}")
+        except ValueError as e:
+            print(f"Erreur: {e}")
+
+    def handle_generate_sections_round(self, tournament: Tournament):
+        """
+        Handle generating the next round of every section.
+
+        Args:
+            tournament: Tournament instance
+        """
+        try:
+            rounds = self.tournament_controller.generate_sections_round(
+                tournament
+            )
+        except RuntimeError as e:
+            print(f"Erreur: {e}")
+            return
+        for name, rnd in rounds.items():
+            print(f"Section {name}: {rnd.name} créé avec "
+                  f"{len(rnd.games)} matchs.")
+
+    def handle_export(self):
+        """Handle exporting every game to CSV (and Parquet if requested)."""
+        parquet = input("Exporter aussi en Parquet ? (o/N): ").strip().lower()
+        formats = ("csv", "parquet") if parquet == "o" else ("csv",)
+        try:
+            report = export_archive(formats=formats)
+        except (RuntimeError, ValueError, OSError) as e:
+            print(f"Erreur: {e}")
+            return
+        print(f"{len(report['exported'])} tournoi(s) exporté(s), "
+              f"{len(report['skipped'])} inchangé(s), "
+              f"{len(report['removed'])} supprimé(s).")
+        for file_name in report["failed"]:
+            print(f"Fichier illisible, non exporté: {file_name}")
+
+    def handle_simulation(self, tournament: Tournament):
+        """
+        Handle projecting the final standings by simulation.
+
+        Args:
+            tournament: Tournament instance
+        """
+        try:
+            pool = tournament
+            if tournament.sections:
+                pool = self.tournament_controller.get_section(
+                    tournament, input("Section: ").strip()
+                )
+            iterations = int(input("Nombre de simulations [10000]: ").strip()
+                             or 10000)
+            prizes = int(input("Nombre de places primées [3]: ").strip() or 3)
+            if iterations < 1 or prizes < 0:
+                print("Il faut au moins une simulation et un nombre de "
+                      "places primées positif ou nul.")
+                return
+        except KeyError as e:
+            print(f"Section inconnue: {e}")
+            return
+        except ValueError as e:
+            print(f"Erreur: {e}")
+            return
+        players = self.player_controller.get_all_players()
+        ratings = {pid: players[pid].rating
+                   for pid in pool.players if pid in players}
+        projection = self.simulation_controller.simulate(
+            pool, ratings, iterations, prizes
+        )
+        self.view.display_projection(projection)
+
+    def handle_add_section(self, tournament: Tournament):
+        """
+        Handle adding a section to a tournament.
+
+        Args:
+            tournament: Tournament instance
+        """
+        if tournament.rounds:
+            print("Impossible d'ajouter une section: le tournoi a déjà "
+                  "des rounds.")
+            return
+        name = input("Nom de la section: ").strip()
+        print("Joueurs de la section (laisser vide pour terminer):")
+        players = []
+        while True:
+            nid = input("National ID (ou Entrée pour finir): ").strip()
+            if not nid:
+                break
+            players.append(nid)
+        system = input("Système (1 suisse, 2 toutes rondes, "
+                       "3 double toutes rondes) [1]: ").strip()
+        systems = {"": SWISS, "1": SWISS, "2": ROUND_ROBIN,
+                   "3": DOUBLE_ROUND_ROBIN}
+        try:
+            self.tournament_controller.add_section(
+                tournament, name, players, systems[system]
+            )
+            print(f"Section {name} créée avec {len(players)} joueurs.")
+        except KeyError:
+            print("Système invalide.")
+        except ValueError as e:
+            print(f"Erreur: {e}")
+
     
 
     def run_cli(self):
@@ -204,6 +427,10 @@ class AppController:
                     tournament = self.handle_load_tournament()
                     if tournament:
                         self.handle_tournament_submenu(tournament)
+                elif choice == "8":
+                    self.handle_export()
+                elif choice == "9":
+                    self.view.display_violations(verify_archive())
                 else:
                     print("Choix invalide.")
                                   
@@ -242,10 +469,37 @@ class AppController:
         if not self.player_controller.player_exists(national_id):
             return False
         if national_id not in tournament.players:
-            tournament.players.append(national_id)
-            save_tournament(tournament)
+            self.tournament_controller.register_players(tournament,
+                                                        [national_id])
         return True
 
+    def register_players_to_tournament(self, tournament: Tournament,
+                                       national_ids: List[str]
+                                       ) -> Tuple[List[str], List[str]]:
+        """
+        Register several players to a tournament with a single save.
+
+        Args:
+            tournament: Tournament instance
+            national_ids: Players' national IDs
+
+        Returns:
+            (national IDs newly registered, national IDs that are not in
+            the roster and were not registered)
+        """
+        known = {nid for nid in national_ids
+                 if self.player_controller.player_exists(nid)}
+        added = []
+        with storage_lock():
+            refresh_tournament(tournament)
+            registered = set(tournament.players)
+            # Only a real change becomes an undo step.
+            if known - registered:
+                added = self.tournament_controller.register_players(
+                    tournament, [nid for nid in national_ids
+                                 if nid in known])
+        return added, [nid for nid in national_ids if nid not in known]
+
     def get_tournament_files(self) -> list:
         """
         Get list of available tournament files.
@@ -299,4 +553,6 @@ class AppController:
         Args:
             tournament: Tournament instance to save
         """
-        save_tournament(tournament)
+        with storage_lock():
+            refresh_tournament(tournament)
+            save_tournament(tournament)
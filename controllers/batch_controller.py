@@ -0,0 +1,281 @@
+"""Batch controller running tournament commands without input()."""
+
+import argparse
+import json
+import shlex
+import sys
+from typing import Dict, List, Optional, TextIO
+from models.classes import Tournament, PAIRING_SYSTEMS, SWISS
+from storage.save import (save_tournament, load_tournament,
+                          list_tournament_files, tournament_file_name,
+                          storage_lock, refresh_tournament)
+from controllers.app_controller import AppController
+from controllers.result_entry_controller import ResultEntryController
+
+
+class _Parser(argparse.ArgumentParser):
+    """Argument parser raising ValueError instead of exiting."""
+
+    def error(self, message):
+        """Report a usage error to the caller."""
+        raise ValueError(message)
+
+
+class BatchController:
+    """
+    Controller running subcommands and printing their results as JSON.
+
+    Tournaments are kept in memory between the commands of a script, so
+    a long script runs at the speed of the controllers; each command
+    reloads a tournament another process saved in the meantime.
+    """
+
+    def __init__(self, app_controller: Optional[AppController] = None):
+        """
+        Initialize the batch controller.
+
+        Args:
+            app_controller: Controller whose operations are reused
+        """
+        self.app_controller = app_controller or AppController()
+        self.tournament_controller = self.app_controller.tournament_controller
+        self._tournaments: Dict[str, Tournament] = {}
+        self.parser = self._build_parser()
+
+    @staticmethod
+    def _build_parser() -> argparse.ArgumentParser:
+        """Build the parser of every subcommand."""
+        parser = _Parser(prog="main.py", add_help=False)
+        sub = parser.add_subparsers(dest="command", required=True,
+                                    parser_class=_Parser)
+        p = sub.add_parser("add-player", add_help=False)
+        p.add_argument("--id", required=True, dest="national_id")
+        p.add_argument("--last-name", required=True)
+        p.add_argument("--first-name", required=True)
+        p.add_argument("--birth-date", required=True)
+        p.add_argument("--rating", type=int)
+        p = sub.add_parser("create", add_help=False)
+        p.add_argument("--name", required=True)
+        p.add_argument("--location", required=True)
+        p.add_argument("--start", required=True)
+        p.add_argument("--end", required=True)
+        p.add_argument("--description", default="")
+        p.add_argument("--rounds", type=int, default=4)
+        p.add_argument("--system", choices=PAIRING_SYSTEMS, default=SWISS)
+        p = sub.add_parser("register", add_help=False)
+        p.add_argument("--tournament", required=True)
+        p.add_argument("players", nargs="+")
+        p = sub.add_parser("pair", add_help=False)
+        p.add_argument("--tournament", required=True)
+        p = sub.add_parser("enter-results", add_help=False)
+        p.add_argument("--tournament", required=True)
+        p.add_argument("--section")
+        p.add_argument("--round", type=int,
+                       help="round index (default: last round)")
+        p.add_argument("codes", nargs="+")
+        p = sub.add_parser("standings", add_help=False)
+        p.add_argument("--tournament", required=True)
+        p.add_argument("--section")
+        p = sub.add_parser("script", add_help=False)
+        p.add_argument("file", help="file of commands, - for stdin")
+        p.add_argument("--stop-on-error", action="store_true")
+        return parser
+
+    def _tournament(self, name: str) -> Tournament:
+        """
+        Get a tournament by file name, loading it on first use and
+        reloading it if another process saved it since.
+
+        Args:
+            name: Tournament file name (the .json suffix is optional)
+
+        Returns:
+            Tournament instance
+
+        Raises:
+            KeyError: If there is no such tournament
+        """
+        file_name = name if name.endswith(".json") else f"{name}.json"
+        with storage_lock():
+            if file_name not in self._tournaments:
+                if file_name not in list_tournament_files():
+                    raise KeyError(f"Unknown tournament: {name}.")
+                self._tournaments[file_name] = load_tournament(file_name)
+            else:
+                refresh_tournament(self._tournaments[file_name])
+        return self._tournaments[file_name]
+
+    def execute(self, argv: List[str]) -> dict:
+        """
+        Run one subcommand (except script).
+
+        Args:
+            argv: Subcommand and its arguments
+
+        Returns:
+            Result dictionary, with "ok" set to False and an "error"
+            message if the command failed
+        """
+        try:
+            args = self.parser.parse_args(argv)
+            if args.command == "script":
+                raise ValueError("script cannot be nested.")
+            handler = getattr(self, "_cmd_" + args.command.replace("-", "_"))
+            result = handler(args)
+        except (ValueError, KeyError, IndexError, RuntimeError) as e:
+            message = e.args[0] if e.args else str(e)
+            return {"ok": False, "error": str(message)}
+        except SystemExit:
+            # argparse actions that print and exit must not end a script
+            return {"ok": False, "error": "Invalid command."}
+        return {"ok": True, **result}
+
+    def run(self, argv: List[str], out: TextIO = sys.stdout) -> int:
+        """
+        Run a subcommand and print its result as JSON.
+
+        Args:
+            argv: Subcommand and its arguments
+            out: Output stream
+
+        Returns:
+            Exit status: 0 on success, 1 if a command failed
+        """
+        if argv[:1] == ["script"]:
+            try:
+                args = self.parser.parse_args(argv)
+            except ValueError as e:
+                self._print({"ok": False, "error": str(e)}, out)
+                return 1
+            if args.file == "-":
+                return self.run_script(sys.stdin, out, args.stop_on_error)
+            with open(args.file, encoding="utf-8") as f:
+                return self.run_script(f, out, args.stop_on_error)
+        result = self.execute(argv)
+        self._print(result, out)
+        return 0 if result["ok"] else 1
+
+    def run_script(self, lines: TextIO, out: TextIO = sys.stdout,
+                   stop_on_error: bool = False) -> int:
+        """
+        Run one subcommand per line, printing one JSON line per command.
+
+        Blank lines and lines starting with # are skipped.
+
+        Args:
+            lines: Lines of commands, as typed on the command line
+            out: Output stream
+            stop_on_error: Stop at the first failed command
+
+        Returns:
+            Exit status: 0 if every command succeeded, 1 otherwise
+        """
+        status = 0
+        for number, line in enumerate(lines, start=1):
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            try:
+                result = self.execute(shlex.split(line))
+            except ValueError as e:
+                result = {"ok": False, "error": str(e)}
+            result["line"] = number
+            self._print(result, out)
+            if not result["ok"]:
+                status = 1
+                if stop_on_error:
+                    break
+        return status
+
+    @staticmethod
+    def _print(result: dict, out: TextIO) -> None:
+        """Write a result as one line of JSON, at once for piped readers."""
+        out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        out.flush()
+
+    def _cmd_add_player(self, args) -> dict:
+        """Add a player to the roster."""
+        if not self.app_controller.player_controller.add_player(
+                args.national_id, args.last_name, args.first_name,
+                args.birth_date, args.rating):
+            raise ValueError(f"Player {args.national_id} already exists.")
+        return {"player": args.national_id}
+
+    def _cmd_create(self, args) -> dict:
+        """Create a tournament."""
+        tournament = Tournament(args.name, args.location, args.start,
+                                args.end, args.description, args.rounds)
+        tournament.system = args.system
+        file_name = tournament_file_name(tournament)
+        if file_name in self._tournaments or \
+                file_name in list_tournament_files():
+            raise ValueError(f"Tournament {file_name} already exists.")
+        save_tournament(tournament)
+        self._tournaments[file_name] = tournament
+        return {"tournament": file_name}
+
+    def _cmd_register(self, args) -> dict:
+        """Register players to a tournament."""
+        tournament = self._tournament(args.tournament)
+        added, unknown = self.app_controller.register_players_to_tournament(
+            tournament, args.players)
+        return {"registered": len(added), "unknown": unknown}
+
+    def _cmd_pair(self, args) -> dict:
+        """Generate the next round of a tournament or of all its sections."""
+        tournament = self._tournament(args.tournament)
+        tc = self.tournament_controller
+        if tournament.sections:
+            rounds = tc.generate_sections_round(tournament)
+            return {"sections": {
+                name: {"round": len(tc.get_section(tournament, name).rounds)
+                       - 1, "name": rnd.name,
+                       "games": [[g[0][0], g[1][0]] for g in rnd.games]}
+                for name, rnd in rounds.items()}}
+        if not tournament.rounds:
+            if tournament.system != SWISS:
+                # Round-robin schedules depend on the registered players.
+                tc.configure_schedule(tournament, tournament.system,
+                                      tournament.teams or None)
+            rnd = tc.generate_round_one(tournament)
+        else:
+            rnd = tc.generate_subsequent_round(tournament)
+        return {"round": len(tournament.rounds) - 1, "name": rnd.name,
+                "games": [[g[0][0], g[1][0]] for g in rnd.games]}
+
+    def _cmd_enter_results(self, args) -> dict:
+        """Enter result codes for the boards of a round."""
+        # The default round is resolved on the current file, not on a copy
+        # another process may have paired further since.
+        with storage_lock():
+            tournament = self._tournament(args.tournament)
+            pool = tournament
+            if args.section is not None:
+                pool = self.tournament_controller.get_section(tournament,
+                                                              args.section)
+            round_index = len(pool.rounds) - 1 if args.round is None \
+                else args.round
+            entry = ResultEntryController(self.tournament_controller,
+                                          tournament, round_index,
+                                          args.section, journaled=False)
+            entry.enter_line(" ".join(args.codes), 0)
+            entered = entry.commit()
+        return {"round": round_index, "entered": entered,
+                "pending": len(entry.pending())}
+
+    def _cmd_standings(self, args) -> dict:
+        """Compute the standings of a tournament or section."""
+        with storage_lock():
+            tournament = self._tournament(args.tournament)
+            pool = tournament
+            if args.section is not None:
+                pool = self.tournament_controller.get_section(tournament,
+                                                              args.section)
+            points = self.tournament_controller.compute_tournament_points(
+                pool)
+        ordered = sorted(points.items(), key=lambda x: (-x[1], x[0]))
+        standings, rank = [], 0
+        for pos, (pid, pt) in enumerate(ordered):
+            if pos == 0 or pt != ordered[pos - 1][1]:
+                rank = pos + 1
+            standings.append({"rank": rank, "player": pid, "points": pt})
+        return {"round": pool.current_round, "standings": standings}
@@ -0,0 +1,388 @@
+"""Live controller publishing standings and pairings as change-only diffs."""
+
+import json
+import os
+import selectors
+import socket
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from controllers.tournament_controller import TournamentController
+from models.classes import Tournament
+
+
+# Outgoing bytes queued for one socket subscriber before it is dropped.
+MAX_CLIENT_BUFFER = 4 * 1024 * 1024
+
+
+class _PoolState:
+    """Published state of one tournament or section."""
+
+    def __init__(self):
+        """Initialize an empty state."""
+        self.results: List[List[tuple]] = []
+        self.totals: Dict[str, float] = {}
+        self.ranks: Dict[str, int] = {}
+        self.published: Dict[str, float] = {}
+        self.seq = 0
+
+
+class LiveController:
+    """
+    Controller turning tournament changes into diffs for wall screens.
+
+    It listens to TournamentController, rescans only the round that
+    changed (and any new round), keeps points up to date by applying the
+    result deltas, and encodes each diff once for every subscriber.
+    """
+
+    def __init__(self, tournament_controller: TournamentController):
+        """
+        Initialize the live controller and start listening.
+
+        Args:
+            tournament_controller: Controller whose changes are published
+        """
+        self.tournament_controller = tournament_controller
+        self._states: Dict[Tuple[str, str], _PoolState] = {}
+        self._latest: Dict[Tuple[str, str], dict] = {}
+        self._sinks = []
+        self._lock = threading.RLock()
+        tournament_controller.add_listener(self.on_change)
+
+    def add_sink(self, sink) -> None:
+        """
+        Add a destination for published messages.
+
+        Args:
+            sink: FileSink or SocketSink
+        """
+        sink.attach(self)
+        self._sinks.append(sink)
+
+    def track(self, tournament: Tournament) -> None:
+        """
+        Publish the full state of a tournament and follow its changes.
+
+        Args:
+            tournament: Tournament instance
+        """
+        for pool in [tournament] + list(tournament.sections):
+            self.on_change(tournament, pool, len(pool.rounds) - 1)
+
+    def on_change(self, tournament: Tournament, pool,
+                  round_index: Optional[int]) -> None:
+        """
+        Publish the diff caused by a change of one round.
+
+        Args:
+            tournament: Tournament instance
+            pool: Tournament or Section that changed
+            round_index: Index of the changed round (None: any round)
+        """
+        section = "" if pool is tournament else pool.name
+        key = (tournament.name, section)
+        with self._lock:
+            message = self._diff(key, pool, round_index)
+            if message is None:
+                return
+            message.update({"tournament": tournament.name,
+                            "section": section})
+            self._latest[key] = self._snapshot(key, pool)
+            payload = (json.dumps(message, ensure_ascii=False) + "\n"
+                       ).encode("utf-8")
+            for sink in self._sinks:
+                sink.publish(key, message, payload)
+
+    def _diff(self, key: Tuple[str, str], pool,
+              round_index: Optional[int]) -> Optional[dict]:
+        """Update the state of a pool and return what changed, if anything."""
+        state = self._states.get(key)
+        reset = state is None or len(pool.rounds) < len(state.results)
+        if reset:
+            state = self._states[key] = _PoolState()
+            scan = range(len(pool.rounds))
+        elif round_index is None:
+            scan = range(len(pool.rounds))
+        else:
+            scan = sorted({round_index} | set(range(len(state.results),
+                                                    len(pool.rounds))))
+        for pid in pool.players:
+            state.totals.setdefault(pid, 0.0)
+        points = TournamentController._calculate_match_points
+        new_rounds, results = [], []
+        for ri in scan:
+            if ri < 0 or ri >= len(pool.rounds):
+                continue
+            rnd = pool.rounds[ri]
+            if ri == len(state.results):
+                state.results.append([])
+                new_rounds.append({"round": ri, "name": rnd.name,
+                                   "games": [list(g) for g in rnd.games]})
+            stored = state.results[ri]
+            for board, game in enumerate(rnd.games):
+                current = (game[0][0], game[1][0], game[0][1], game[1][1])
+                old = stored[board] if board < len(stored) else None
+                if old == current:
+                    continue
+                for w, b, s1, s2, sign in ((old or (None,) * 4) + (-1,),
+                                           current + (1,)):
+                    if w in state.totals and s1 is not None:
+                        state.totals[w] += sign * points(s1, s2)
+                    if b in state.totals and s2 is not None:
+                        state.totals[b] += sign * points(s2, s1)
+                if board < len(stored):
+                    stored[board] = current
+                    results.append({"round": ri, "board": board,
+                                    "white": current[0], "black": current[1],
+                                    "score": [current[2], current[3]]})
+                else:
+                    stored.append(current)
+        standings = self._moved(state)
+        if not (reset or new_rounds or results or standings):
+            return None
+        state.seq += 1
+        return {"type": "reset" if reset else "diff", "seq": state.seq,
+                "rounds": new_rounds, "results": results,
+                "standings": standings}
+
+    @staticmethod
+    def _moved(state: _PoolState) -> List[dict]:
+        """Re-rank the pool and return the players whose line changed."""
+        ordered = sorted(state.totals.items(), key=lambda x: (-x[1], x[0]))
+        moved = []
+        rank = 0
+        for pos, (pid, pt) in enumerate(ordered):
+            if pos == 0 or pt != ordered[pos - 1][1]:
+                rank = pos + 1
+            previous = state.ranks.get(pid)
+            if previous != rank or state.published.get(pid) != pt:
+                moved.append({"player": pid, "rank": rank, "points": pt,
+                              "previous_rank": previous})
+            state.ranks[pid] = rank
+            state.published[pid] = pt
+        return moved
+
+    def _snapshot(self, key: Tuple[str, str], pool) -> dict:
+        """Build the full state sent to a new subscriber."""
+        state = self._states[key]
+        ordered = sorted(state.ranks.items(), key=lambda x: (x[1], x[0]))
+        latest = pool.rounds[-1] if pool.rounds else None
+        return {
+            "type": "snapshot", "tournament": key[0], "section": key[1],
+            "seq": state.seq,
+            "round": None if latest is None else {
+                "round": len(pool.rounds) - 1, "name": latest.name,
+                "games": [list(g) for g in latest.games]},
+            "standings": [{"player": pid, "rank": rank,
+                           "points": state.totals[pid]}
+                          for pid, rank in ordered],
+        }
+
+    def snapshots(self) -> List[dict]:
+        """
+        Get the full state of every published pool.
+
+        Returns:
+            List of snapshot messages
+        """
+        with self._lock:
+            return list(self._latest.values())
+
+
+class FileSink:
+    """Publish diffs and the latest snapshot as static JSON files."""
+
+    def __init__(self, directory):
+        """
+        Initialize the sink.
+
+        Args:
+            directory: Directory served to the wall screens
+        """
+        self.directory = Path(directory)
+        self.live = None
+
+    def attach(self, live: LiveController) -> None:
+        """Remember the live controller providing snapshots."""
+        self.live = live
+
+    def publish(self, key: Tuple[str, str], message: dict,
+                payload: bytes) -> None:
+        """
+        Write diff-<seq>.json and refresh state.json for a pool.
+
+        Args:
+            key: (tournament name, section name)
+            message: Diff message
+            payload: Encoded message
+        """
+        name = "_".join(part for part in key if part)
+        folder = self.directory / name.replace(" ", "_").replace("/", "-")
+        folder.mkdir(parents=True, exist_ok=True)
+        self._write(folder / f"diff-{message['seq']:06d}.json", payload)
+        snapshot = json.dumps(self.live._latest[key], ensure_ascii=False)
+        self._write(folder / "state.json", snapshot.encode("utf-8"))
+
+    @staticmethod
+    def _write(path: Path, data: bytes) -> None:
+        """Atomically replace a file."""
+        tmp = path.with_name(f".{path.name}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+
+class SocketSink:
+    """
+    Broadcast newline-delimited JSON diffs to TCP subscribers.
+
+    A single thread multiplexes every connection; a new subscriber first
+    receives the snapshot of every pool, then the diffs. Slow subscribers
+    are dropped instead of holding back the others.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        """
+        Open the listening socket.
+
+        Args:
+            host: Address to listen on
+            port: TCP port (0 picks a free one)
+        """
+        self._server = socket.create_server((host, port))
+        self._server.setblocking(False)
+        self.address = self._server.getsockname()
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._server, selectors.EVENT_READ)
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+        self._clients: Dict[socket.socket, bytearray] = {}
+        self._stalled = set()
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self.live = None
+
+    def attach(self, live: LiveController) -> None:
+        """Remember the live controller and start serving."""
+        self.live = live
+        self._running = True
+        self._thread.start()
+
+    def publish(self, key: Tuple[str, str], message: dict,
+                payload: bytes) -> None:
+        """
+        Queue an encoded diff for every subscriber.
+
+        Subscribers whose queue would exceed MAX_CLIENT_BUFFER stopped
+        reading; they are dropped by the serving thread.
+
+        Args:
+            key: (tournament name, section name)
+            message: Diff message
+            payload: Encoded message, shared by all subscribers
+        """
+        with self._lock:
+            for sock, buffer in self._clients.items():
+                if sock in self._stalled:
+                    continue
+                if len(buffer) + len(payload) > MAX_CLIENT_BUFFER:
+                    self._stalled.add(sock)
+                    buffer.clear()
+                else:
+                    buffer += payload
+        self._wake_w.send(b"\0")
+
+    @property
+    def subscriber_count(self) -> int:
+        """Number of connected subscribers."""
+        with self._lock:
+            return len(self._clients)
+
+    def close(self) -> None:
+        """Stop serving and disconnect every subscriber."""
+        self._running = False
+        self._wake_w.send(b"\0")
+        self._thread.join()
+        for sock in list(self._clients):
+            sock.close()
+        self._server.close()
+        self._wake_r.close()
+        self._wake_w.close()
+
+    def _loop(self) -> None:
+        """Accept subscribers and flush their buffers."""
+        while self._running:
+            with self._lock:
+                busy = any(self._clients.values())
+            for key, _ in self._selector.select(timeout=0.01 if busy else 1.0):
+                sock = key.fileobj
+                if sock is self._server:
+                    self._accept()
+                elif sock is self._wake_r:
+                    try:
+                        while self._wake_r.recv(4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                else:
+                    self._read(sock)
+            self._flush()
+
+    def _read(self, sock: socket.socket) -> None:
+        """Drop a subscriber that closed or reset its connection."""
+        try:
+            closed = sock.recv(1) == b""
+        except BlockingIOError:
+            return
+        except OSError:
+            closed = True
+        if closed:
+            self._drop(sock)
+
+    def _accept(self) -> None:
+        """Register a new subscriber with the current snapshots."""
+        try:
+            sock, _ = self._server.accept()
+        except OSError:  # includes BlockingIOError and aborted connections
+            return
+        sock.setblocking(False)
+        # Snapshots are taken under the live lock so no diff is missed or
+        # sent twice to the new subscriber.
+        with self.live._lock:
+            initial = bytearray()
+            for snapshot in self.live._latest.values():
+                initial += (json.dumps(snapshot, ensure_ascii=False) + "\n"
+                            ).encode("utf-8")
+            with self._lock:
+                self._clients[sock] = initial
+        self._selector.register(sock, selectors.EVENT_READ)
+
+    def _flush(self) -> None:
+        """Send as much pending data as each subscriber accepts."""
+        with self._lock:
+            stalled = list(self._stalled)
+            pending = [(s, b) for s, b in self._clients.items() if b]
+        for sock in stalled:
+            self._drop(sock)
+        for sock, buffer in pending:
+            try:
+                with self._lock:
+                    sent = sock.send(buffer)
+                    del buffer[:sent]
+            except BlockingIOError:
+                continue
+            except OSError:
+                self._drop(sock)
+
+    def _drop(self, sock: socket.socket) -> None:
+        """Disconnect a subscriber."""
+        with self._lock:
+            self._clients.pop(sock, None)
+            self._stalled.discard(sock)
+        try:
+            self._selector.unregister(sock)
+        except (KeyError, ValueError):
+            pass
+        sock.close()
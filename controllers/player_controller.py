@@ -1,19 +1,37 @@
 """Player controller for managing player operations."""
 
-from typing import Dict
+from typing import Dict, Optional
 from models.classes import Player
-from storage.save import load_players, save_players
+from storage.save import (load_players, save_players, storage_lock,
+                          get_players_generation)
 
 
 class PlayerController:
     """Controller for player management operations."""
 
     def __init__(self):
-        """Initialize the player controller."""
-        self._players = load_players()
+        """Initialize the player controller (roster is loaded on first use)."""
+        self._cache: Optional[Dict[str, Player]] = None
+        self._generation = None
+
+    @property
+    def _players(self) -> Dict[str, Player]:
+        """
+        Get the player roster, loading it on first access and reloading it
+        only when another process has rewritten players.json.
+
+        Returns:
+            Dictionary of all players keyed by national_id
+        """
+        generation = get_players_generation()
+        if self._cache is None or generation != self._generation:
+            self._cache = load_players()
+            self._generation = generation
+        return self._cache
 
     def add_player(self, national_id: str, last_name: str,
-                   first_name: str, birth_date: str) -> bool:
+                   first_name: str, birth_date: str,
+                   rating: Optional[int] = None) -> bool:
         """
         Add a new player to the system.
 
@@ -22,15 +40,20 @@ class PlayerController:
             last_name: Player's last name
             first_name: Player's first name
             birth_date: Birth date in DD/MM/YYYY format
+            rating: Elo rating (optional)
 
         Returns:
             True if player was added, False if player already exists
         """
-        if national_id in self._players:
-            return False
-        player = Player(last_name, first_name, birth_date, national_id)
-        self._players[national_id] = player
-        save_players(self._players)
+        with storage_lock():
+            players = self._players
+            if national_id in players:
+                return False
+            player = Player(last_name, first_name, birth_date, national_id,
+                            rating)
+            players[national_id] = player
+            save_players(players)
+            self._generation = get_players_generation()
         return True
 
     def get_all_players(self) -> Dict[str, Player]:
@@ -68,5 +91,6 @@ class PlayerController:
 
     def reload_players(self):
         """Reload players from storage."""
-        self._players = load_players()
+        self._generation = get_players_generation()
+        self._cache = load_players()
 
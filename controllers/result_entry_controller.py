@@ -0,0 +1,224 @@
+"""Result entry controller for fast, resumable entry of a round's results."""
+
+from typing import Dict, List, Optional, Tuple
+from models.classes import Tournament
+from controllers.tournament_controller import TournamentController
+from storage.save import (tournament_file_name, journal_name, append_journal,
+                          load_journal, clear_journal, storage_lock,
+                          refresh_tournament)
+
+
+BYE = "BYE"
+# Result codes accepted per board, white's score first.
+RESULT_CODES = {
+    "1-0": (1.0, 0.0), "1": (1.0, 0.0),
+    "0-1": (0.0, 1.0), "0": (0.0, 1.0),
+    "½": (0.5, 0.5), "=": (0.5, 0.5), "½-½": (0.5, 0.5),
+    "1/2": (0.5, 0.5), "1/2-1/2": (0.5, 0.5),
+}
+
+
+def parse_result(code: str) -> Tuple[float, float]:
+    """
+    Convert a result code into a score pair.
+
+    Args:
+        code: One of RESULT_CODES
+
+    Returns:
+        (white score, black score)
+
+    Raises:
+        ValueError: If the code is unknown
+    """
+    try:
+        return RESULT_CODES[code.strip().lower()]
+    except KeyError:
+        raise ValueError(f"Unknown result code: {code}.") from None
+
+
+class ResultEntryController:
+    """
+    Controller for entering the results of one round.
+
+    Each accepted line of results is appended to a journal right away,
+    so an interrupted entry resumes where it stopped. The tournament
+    itself is saved once, when the entry is committed; a result is only
+    saved if its board still has the pairing it was entered for.
+    """
+
+    def __init__(self, tournament_controller: TournamentController,
+                 tournament: Tournament, round_index: int,
+                 section_name: Optional[str] = None,
+                 journaled: bool = True):
+        """
+        Start or resume the entry of a round.
+
+        Args:
+            tournament_controller: Controller saving the results
+            tournament: Tournament instance
+            round_index: Index of the round
+            section_name: Section of the round (None for a flat tournament)
+            journaled: Checkpoint accepted lines (False for scripted entry,
+                which is committed at once)
+
+        Raises:
+            IndexError: If round index is invalid
+            KeyError: If the section does not exist
+        """
+        self.tournament_controller = tournament_controller
+        self.tournament = tournament
+        self.round_index = round_index
+        self.section_name = section_name
+        self.journaled = journaled
+        self.games = self._round_games()
+        self.journal = journal_name(tournament_file_name(tournament),
+                                    round_index, section_name)
+        self.results: Dict[int, Tuple[float, float]] = {}
+        # (white, black) of each entered board when its result was typed.
+        self.pairings: Dict[int, Tuple[str, str]] = {}
+        # Boards dropped at commit because their pairing had changed.
+        self.stale: List[int] = []
+        for entry in load_journal(self.journal) if journaled else []:
+            for board, white, black, s1, s2 in entry:
+                # Skip boards whose pairing changed since (e.g. undo).
+                if self._players(board) == (white, black):
+                    self.results[board] = (s1, s2)
+                    self.pairings[board] = (white, black)
+
+    def _round_games(self) -> List[list]:
+        """
+        Get the games of the round from the tournament.
+
+        Raises:
+            IndexError: If round index is invalid
+            KeyError: If the section does not exist
+        """
+        pool = self.tournament
+        if self.section_name is not None:
+            pool = self.tournament_controller.get_section(self.tournament,
+                                                          self.section_name)
+        if self.round_index < 0 or self.round_index >= len(pool.rounds):
+            raise IndexError("Invalid round index.")
+        return pool.rounds[self.round_index].games
+
+    def _players(self, board: int) -> Optional[Tuple[str, str]]:
+        """Get the (white, black) IDs of a board, or None if out of range."""
+        if 0 <= board < len(self.games):
+            game = self.games[board]
+            return game[0][0], game[1][0]
+        return None
+
+    def is_bye(self, board: int) -> bool:
+        """Return True if the board is a bye (its score is automatic)."""
+        return BYE in self._players(board)
+
+    def pending(self) -> List[int]:
+        """
+        Get the boards still waiting for a result.
+
+        Returns:
+            Board indices without a stored or entered result, byes excluded
+        """
+        return [board for board, game in enumerate(self.games)
+                if board not in self.results and not self.is_bye(board)
+                and game[0][1] is None and game[1][1] is None]
+
+    def next_board(self, start: int = 0) -> Optional[int]:
+        """
+        Get the first pending board from a position, wrapping around.
+
+        Args:
+            start: Board to start looking from
+
+        Returns:
+            Board index, or None if every board has a result
+        """
+        boards = self.pending()
+        if not boards:
+            return None
+        return next((b for b in boards if b >= start), boards[0])
+
+    def enter_line(self, line: str, start: int) -> List[int]:
+        """
+        Apply one line of result codes and checkpoint it.
+
+        Codes separated by spaces fill the pending boards in order from
+        ``start``, wrapping around; a code written "N:code" sets board N,
+        even if it already has a result. The whole line is checked before
+        anything is applied, so an invalid code leaves every board as is.
+
+        Args:
+            line: Result codes, e.g. "1-0 = 0-1" or "12:½"
+            start: Board the first positional code applies to
+
+        Returns:
+            Indices of the boards set by the line
+
+        Raises:
+            ValueError: If a code or board number is invalid, or there
+                are more codes than pending boards
+        """
+        results = {}
+        boards = self.pending()
+        queue = [b for b in boards if b >= start] + \
+            [b for b in boards if b < start]
+        for token in line.split():
+            if ":" in token:
+                board, code = token.split(":", 1)
+                if not board.isdigit() or self._players(int(board)) is None:
+                    raise ValueError(f"Invalid board: {board}.")
+                board = int(board)
+                if self.is_bye(board):
+                    raise ValueError(f"Board {board} is a bye.")
+            else:
+                queue = [b for b in queue if b not in results]
+                if not queue:
+                    raise ValueError("More results than pending boards.")
+                board, code = queue.pop(0), token
+            results[board] = parse_result(code)
+        if results and self.journaled:
+            append_journal(self.journal, [
+                [board, *self._players(board), s1, s2]
+                for board, (s1, s2) in results.items()])
+        self.results.update(results)
+        self.pairings.update((board, self._players(board)) for board in results)
+        return list(results)
+
+    def commit(self) -> int:
+        """
+        Save the entered results in the tournament and drop the journal.
+
+        The round is reloaded under the storage lock first; results of
+        boards whose pairing changed since they were entered (another
+        terminal rolled back and re-paired the round) are dropped and
+        listed in ``stale``.
+
+        Returns:
+            Number of results saved
+
+        Raises:
+            IndexError: If the round no longer exists
+            KeyError: If the section no longer exists
+        """
+        with storage_lock():
+            refresh_tournament(self.tournament)
+            self.games = self._round_games()
+            self.stale = [board for board in self.results
+                          if self._players(board) != self.pairings[board]]
+            scores = {board: score for board, score in self.results.items()
+                      if board not in self.stale}
+            if scores:
+                self.tournament_controller.enter_scores_for_round(
+                    self.tournament, self.round_index, scores,
+                    self.section_name
+                )
+        if self.journaled:
+            clear_journal(self.journal)
+        return len(scores)
+
+    def discard(self) -> None:
+        """Forget the entered results and drop the journal."""
+        self.results.clear()
+        self.pairings.clear()
+        clear_journal(self.journal)
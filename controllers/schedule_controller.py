@@ -0,0 +1,155 @@
+"""Schedule controller for round-robin and scheveningen pairings."""
+
+from typing import Iterator, List
+from models.classes import (Tournament, ROUND_ROBIN, DOUBLE_ROUND_ROBIN,
+                            SCHEVENINGEN)
+
+
+BYE = "BYE"
+
+
+class ScheduleController:
+    """
+    Controller computing fixed schedules known in advance.
+
+    Every round is computed directly from its index in O(n), so a full
+    schedule costs O(n²) and rounds can be materialised one at a time.
+    """
+
+    @staticmethod
+    def berger_round(players: List[str], round_index: int) -> List[list]:
+        """
+        Compute one round of a single round-robin (circle method).
+
+        Args:
+            players: Player IDs in pairing-number order
+            round_index: Round index (0-based)
+
+        Returns:
+            List of games [[white_id, score], [black_id, score]]
+        """
+        ids = list(players)
+        if len(ids) % 2 == 1:
+            ids.append(BYE)
+        n = len(ids)
+        m = n - 1
+        fixed = ids[-1]
+        r = round_index % m
+        games = []
+        # Player k meets the fixed player when 2k = r (mod m); m is odd.
+        k = (r * (m + 1) // 2) % m
+        if r % 2 == 0:
+            games.append([[fixed, None], [ids[k], None]])
+        else:
+            games.append([[ids[k], None], [fixed, None]])
+        for d in range(1, n // 2):
+            i, j = (k + d) % m, (k - d) % m
+            # (i - j) mod m has opposite parities for i and j, so colours
+            # alternate from round to round for every player.
+            if ((i - j) % m) % 2 == 1:
+                games.append([[ids[i], None], [ids[j], None]])
+            else:
+                games.append([[ids[j], None], [ids[i], None]])
+        return [ScheduleController._apply_bye(g) for g in games]
+
+    @staticmethod
+    def scheveningen_round(teams: List[List[str]],
+                           round_index: int) -> List[list]:
+        """
+        Compute one round of a scheveningen match between two teams.
+
+        Args:
+            teams: Two lists of player IDs of equal length
+            round_index: Round index (0-based)
+
+        Returns:
+            List of games [[white_id, score], [black_id, score]]
+        """
+        team_a, team_b = teams
+        n = len(team_a)
+        games = []
+        for board in range(n):
+            j = (board + round_index) % n
+            a, b = team_a[board], team_b[j]
+            # Colours follow the parity of both players' indices: j moves by
+            # one each round (wrapping), so both teams alternate and get
+            # n/2 whites each, with at most two same colours in a row.
+            if (board + j) % 2 == 0:
+                games.append([[a, None], [b, None]])
+            else:
+                games.append([[b, None], [a, None]])
+        return games
+
+    @staticmethod
+    def _apply_bye(game: list) -> list:
+        """Score a game against BYE the way the Swiss pairing does."""
+        p1, p2 = game[0][0], game[1][0]
+        if p1 == BYE:
+            return [[p2, 1.0], [BYE, 0.0]]
+        if p2 == BYE:
+            return [[p1, 1.0], [BYE, 0.0]]
+        return game
+
+    @staticmethod
+    def total_rounds(tournament: Tournament) -> int:
+        """
+        Get the number of rounds of a scheduled tournament.
+
+        Args:
+            tournament: Tournament instance
+
+        Returns:
+            Number of rounds implied by the pairing system
+        """
+        if tournament.system == SCHEVENINGEN:
+            return len(tournament.teams[0]) if tournament.teams else 0
+        n = len(tournament.players)
+        single = n if n % 2 == 1 else n - 1
+        if tournament.system == DOUBLE_ROUND_ROBIN:
+            return 2 * single
+        return single
+
+    def round_games(self, tournament: Tournament,
+                    round_index: int) -> List[list]:
+        """
+        Compute the games of a given round of a scheduled tournament.
+
+        Args:
+            tournament: Tournament instance
+            round_index: Round index (0-based)
+
+        Returns:
+            List of games
+
+        Raises:
+            IndexError: If the round is outside the schedule
+        """
+        if round_index < 0 or round_index >= self.total_rounds(tournament):
+            raise IndexError("Round outside the schedule.")
+        if tournament.system == SCHEVENINGEN:
+            return self.scheveningen_round(tournament.teams, round_index)
+        single = self.total_rounds(tournament)
+        if tournament.system != DOUBLE_ROUND_ROBIN:
+            return self.berger_round(tournament.players, round_index)
+        single //= 2
+        if round_index >= single:
+            games = self.berger_round(tournament.players, round_index - single)
+            return [g if g[1][0] == BYE else [g[1], g[0]] for g in games]
+        # The last two rounds of the first cycle are swapped so nobody gets
+        # the same colour three times in a row when the cycles meet.
+        if single >= 2 and round_index >= single - 2:
+            round_index = 2 * single - 3 - round_index
+        return self.berger_round(tournament.players, round_index)
+
+    def iter_schedule(self, tournament: Tournament) -> Iterator[List[list]]:
+        """
+        Iterate lazily over every round of the schedule.
+
+        Args:
+            tournament: Tournament instance
+
+        Yields:
+            List of games for each round in order
+        """
+        for idx in range(self.total_rounds(tournament)):
+            yield self.round_games(tournament, idx)
@@ -0,0 +1,191 @@
+"""Simulation controller projecting final standings by Monte Carlo."""
+
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from models.classes import Round
+from models.compatibility import CompatibilityMatrix
+from controllers.tournament_controller import TournamentController
+
+
+BYE = "BYE"
+DEFAULT_RATING = 1500
+# Share of games drawn between equal opponents.
+DRAW_PROBABILITY = 0.3
+# Iterations per batch; batches are seeded independently so a seed gives
+# the same projection whatever the number of worker processes.
+BATCH_SIZE = 500
+# Below this many iterations a single process is faster than a pool.
+PARALLEL_MIN_ITERATIONS = 2000
+
+
+class _SimulatedPool:
+    """Minimal copy of a tournament or section that a simulation extends."""
+
+    def __init__(self, pool, rounds: List[Round]):
+        """
+        Initialize the simulated pool.
+
+        Args:
+            pool: Tournament or Section being simulated
+            rounds: Rounds to start from (the list is copied, not the rounds)
+        """
+        self.players = pool.players
+        self.num_rounds = pool.num_rounds
+        self.system = pool.system
+        self.teams = pool.teams
+        self.rounds = list(rounds)
+        self.current_round = len(rounds)
+
+
+def _draw(white: str, black: str, ratings: Dict[str, float],
+          rng: random.Random) -> Tuple[float, float]:
+    """
+    Draw the result of a game from the Elo expectation.
+
+    Args:
+        white: White player's ID
+        black: Black player's ID
+        ratings: Ratings keyed by player ID
+        rng: Random generator
+
+    Returns:
+        (white score, black score)
+    """
+    expected = 1 / (1 + 10 ** ((ratings[black] - ratings[white]) / 400))
+    draw = min(DRAW_PROBABILITY, 2 * min(expected, 1 - expected))
+    x = rng.random()
+    if x < expected - draw / 2:
+        return 1.0, 0.0
+    if x < expected + draw / 2:
+        return 0.5, 0.5
+    return 0.0, 1.0
+
+
+def _simulate_batch(pool, ratings: Dict[str, float], iterations: int,
+                    prizes: int, seed: int) -> dict:
+    """
+    Simulate the rest of a pool a number of times.
+
+    The points of the games already played and the compatibility matrix
+    of the existing rounds are computed once per batch; each simulated
+    event starts from copies of them and adds its games as they are drawn.
+
+    Args:
+        pool: Tournament or Section
+        ratings: Ratings keyed by player ID
+        iterations: Number of simulated events
+        prizes: Number of prize places
+        seed: Seed of this batch
+
+    Returns:
+        Dictionary of per-player arrays: win, prize and points totals
+    """
+    rng = random.Random(seed)
+    controller = TournamentController()
+    index = {pid: i for i, pid in enumerate(pool.players)}
+    n = len(pool.players)
+    win, prize, points = [0.0] * n, [0.0] * n, [0.0] * n
+    played = controller.compute_tournament_points(pool)
+    unplayed = [(game[0][0], game[1][0]) for rnd in pool.rounds
+                for game in rnd.games
+                if game[0][1] is None and game[1][1] is None
+                and BYE not in (game[0][0], game[1][0])]
+    base = CompatibilityMatrix(pool.players)
+    for rnd in pool.rounds:
+        base.apply_round(rnd)
+    for _ in range(iterations):
+        totals = dict(played)
+        for white, black in unplayed:
+            s1, s2 = _draw(white, black, ratings, rng)
+            totals[white] += s1
+            totals[black] += s2
+        sim = _SimulatedPool(pool, pool.rounds)
+        matrix = base.copy()
+        while sim.current_round < sim.num_rounds:
+            rnd = Round(f"Round {sim.current_round + 1}")
+            rnd.games = controller.pair_next_round(sim, rng, totals, matrix)
+            for game in rnd.games:
+                white, black = game[0][0], game[1][0]
+                if black == BYE:
+                    totals[white] += game[0][1]
+                    continue
+                game[0][1], game[1][1] = _draw(white, black, ratings, rng)
+                totals[white] += game[0][1]
+                totals[black] += game[1][1]
+            matrix.apply_round(rnd)
+            sim.rounds.append(rnd)
+            sim.current_round += 1
+        ordered = sorted(totals.items(), key=lambda x: -x[1])
+        start = 0
+        while start < len(ordered):
+            end = start
+            while end < len(ordered) and ordered[end][1] == ordered[start][1]:
+                end += 1
+            # Tied players share the places they span.
+            share = max(0, min(end, prizes) - start) / (end - start)
+            for pid, pt in ordered[start:end]:
+                i = index[pid]
+                points[i] += pt
+                prize[i] += share
+                if start == 0:
+                    win[i] += 1 / end
+            start = end
+    return {"win": win, "prize": prize, "points": points}
+
+
+class SimulationController:
+    """Controller for what-if projections of final standings."""
+
+    def simulate(self, pool, ratings: Dict[str, float],
+                 iterations: int = 10000, prizes: int = 3,
+                 seed: Optional[int] = None,
+                 max_workers: Optional[int] = None) -> Dict[str, dict]:
+        """
+        Project final standings by simulating the remaining rounds.
+
+        Unplayed games of existing rounds and every remaining round are
+        drawn from a rating-based model, pairing with the tournament's own
+        pairing logic. Batches run on a process pool when the number of
+        iterations is large enough.
+
+        Args:
+            pool: Tournament or Section (not modified)
+            ratings: Ratings keyed by player ID (missing: DEFAULT_RATING)
+            iterations: Number of simulated events
+            prizes: Number of prize places
+            seed: Seed making the projection reproducible
+            max_workers: Number of worker processes (default: CPU count)
+
+        Returns:
+            Dictionary mapping player IDs to win probability, prize
+            probability and expected final points
+
+        Raises:
+            ValueError: If iterations is below 1 or prizes is negative
+        """
+        if iterations < 1:
+            raise ValueError("At least one simulation is required.")
+        if prizes < 0:
+            raise ValueError("The number of prize places cannot be negative.")
+        ratings = {pid: ratings.get(pid) or DEFAULT_RATING
+                   for pid in pool.players}
+        master = random.Random(seed)
+        sizes = [min(BATCH_SIZE, iterations - start)
+                 for start in range(0, iterations, BATCH_SIZE)]
+        seeds = [master.getrandbits(64) for _ in sizes]
+        args = ([pool] * len(sizes), [ratings] * len(sizes), sizes,
+                [prizes] * len(sizes), seeds)
+        if iterations >= PARALLEL_MIN_ITERATIONS:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(_simulate_batch, *args))
+        else:
+            results = list(map(_simulate_batch, *args))
+        projection = {}
+        for i, pid in enumerate(pool.players):
+            projection[pid] = {
+                "win": sum(r["win"][i] for r in results) / iterations,
+                "prize": sum(r["prize"][i] for r in results) / iterations,
+                "points": sum(r["points"][i] for r in results) / iterations,
+            }
+        return projection
@@ -1,15 +1,397 @@
 """Tournament controller for managing tournament operations."""
 
+import functools
 import random
+import weakref
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict
-from models.classes import Tournament, Game, Round
-from storage.save import save_tournament
+from typing import Callable, Dict, List, Optional, Tuple
+from models.classes import (Tournament, Section, Game, Round, SWISS,
+                            SCHEVENINGEN, PAIRING_SYSTEMS)
+from models.compatibility import CompatibilityMatrix
+from models.history import TournamentHistory, freeze_tournament, thaw_into
+from controllers.schedule_controller import ScheduleController
+from storage.save import (save_tournament, storage_lock, refresh_tournament,
+                          tournament_file_name, save_history, load_history,
+                          get_history_generation)
+from utils import metrics
+
+
+def _locked(method):
+    """
+    Run a tournament operation under the storage lock, on fresh data.
+
+    The tournament is reloaded first if another process saved it, so
+    concurrent arbiter terminals never overwrite each other's changes.
+    """
+    @functools.wraps(method)
+    def wrapper(self, tournament: Tournament, *args, **kwargs):
+        with storage_lock():
+            refresh_tournament(tournament)
+            return method(self, tournament, *args, **kwargs)
+    return wrapper
+
+
+def _synchronized(method):
+    """
+    Run a tournament mutation like _locked and record it for undo.
+
+    The state before the mutation is snapshotted and pushed on the
+    tournament's history once the mutation succeeds.
+    """
+    @functools.wraps(method)
+    def wrapper(self, tournament: Tournament, *args, **kwargs):
+        with storage_lock():
+            refresh_tournament(tournament)
+            history = self._history_for(tournament)
+            before = freeze_tournament(tournament, history.latest())
+            result = method(self, tournament, *args, **kwargs)
+            history.record(before)
+            self._save_history(tournament, history)
+            return result
+    return wrapper
+
+
+# Below this many players, pairing all sections inline beats the cost of
+# starting a process pool.
+PARALLEL_MIN_PLAYERS = 2000
+
+# Constraint sets tried in order until a pairing is found:
+# (enforce colour limits, allow rematches).
+PAIRING_TIERS = ((True, False), (False, False), (False, True))
+# Backtracking steps allowed per search before relaxing the constraints.
+SEARCH_BUDGET = 20000
+# Lowest-ranked bye candidates tried before relaxing the constraints.
+MAX_BYE_TRIES = 5
+
+
+def _pair_section(section: Section, seed: int) -> List[list]:
+    """
+    Compute the next round of a section in a worker process.
+
+    Args:
+        section: Section to pair
+        seed: Random seed so each section gets its own shuffles
+
+    Returns:
+        List of games
+    """
+    return TournamentController().pair_next_round(section,
+                                                  random.Random(seed))
 
 
 class TournamentController:
     """Controller for tournament operations."""
 
+    def __init__(self):
+        """Initialize the tournament controller."""
+        self.schedule_controller = ScheduleController()
+        self._matrices = weakref.WeakKeyDictionary()
+        self._listeners: List[Callable] = []
+        self._histories = weakref.WeakKeyDictionary()
+
+    def add_listener(self, listener: Callable) -> None:
+        """
+        Register a callback run after each round or score change.
+
+        Args:
+            listener: Called as listener(tournament, pool, round_index),
+                pool being the tournament itself or the changed section,
+                round_index None when any round may have changed
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, tournament: Tournament, pool,
+                round_index: Optional[int]) -> None:
+        """Run the listeners for a change of one round of a pool."""
+        for listener in self._listeners:
+            listener(tournament, pool, round_index)
+
+    def _history_for(self, tournament: Tournament) -> TournamentHistory:
+        """
+        Get the undo/redo history of a tournament, reloading it from
+        storage only if another process changed it.
+
+        Args:
+            tournament: Tournament instance
+
+        Returns:
+            TournamentHistory instance
+        """
+        file_name = tournament_file_name(tournament)
+        generation = get_history_generation(file_name)
+        cached = self._histories.get(tournament)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+        history = load_history(file_name) or TournamentHistory()
+        self._histories[tournament] = (generation, history)
+        return history
+
+    def _save_history(self, tournament: Tournament,
+                      history: TournamentHistory) -> None:
+        """Persist a tournament's history and remember its generation."""
+        file_name = tournament_file_name(tournament)
+        save_history(file_name, history)
+        self._histories[tournament] = (get_history_generation(file_name),
+                                       history)
+
+    def _restore(self, tournament: Tournament, snapshot: dict) -> None:
+        """Restore a snapshot, save it and tell the listeners."""
+        thaw_into(tournament, snapshot)
+        save_tournament(tournament)
+        for pool in [tournament] + list(tournament.sections):
+            self._notify(tournament, pool, None)
+
+    @_locked
+    def undo(self, tournament: Tournament) -> bool:
+        """
+        Undo the last change of a tournament.
+
+        Args:
+            tournament: Tournament instance
+
+        Returns:
+            True if a change was undone, False if there was none
+        """
+        history = self._history_for(tournament)
+        if not history.undo_stack:
+            return False
+        previous = history.undo_stack.pop()
+        history.redo_stack.append(freeze_tournament(tournament, previous))
+        self._restore(tournament, previous)
+        self._save_history(tournament, history)
+        return True
+
+    @_locked
+    def redo(self, tournament: Tournament) -> bool:
+        """
+        Redo the last undone change of a tournament.
+
+        Args:
+            tournament: Tournament instance
+
+        Returns:
+            True if a change was redone, False if there was none
+        """
+        history = self._history_for(tournament)
+        if not history.redo_stack:
+            return False
+        following = history.redo_stack.pop()
+        history.undo_stack.append(freeze_tournament(tournament, following))
+        self._restore(tournament, following)
+        self._save_history(tournament, history)
+        return True
+
+    @_synchronized
+    def rollback_to_round(self, tournament: Tournament, round_count: int,
+                          section_name: Optional[str] = None) -> None:
+        """
+        Drop every round after the first ``round_count`` rounds.
+
+        The rollback is recorded like any other change and can be undone.
+
+        Args:
+            tournament: Tournament instance
+            round_count: Number of rounds to keep
+            section_name: Section to roll back (None for a flat tournament)
+
+        Raises:
+            ValueError: If round_count is outside 0..number of rounds
+            KeyError: If the section does not exist
+        """
+        pool = tournament
+        if section_name is not None:
+            pool = self.get_section(tournament, section_name)
+        if round_count < 0 or round_count > len(pool.rounds):
+            raise ValueError("Invalid round number.")
+        del pool.rounds[round_count:]
+        pool.current_round = round_count
+        if tournament.sections:
+            tournament.current_round = max(sec.current_round
+                                           for sec in tournament.sections)
+        save_tournament(tournament)
+        self._notify(tournament, pool, None)
+
+    @_synchronized
+    def configure_schedule(self, tournament: Tournament, system: str,
+                           teams: Optional[List[List[str]]] = None) -> None:
+        """
+        Choose the pairing system of a tournament before round 1.
+
+        For round-robin systems the number of rounds is derived from the
+        number of registered players. For scheveningen, teams default to
+        the first and second half of the registered players.
+
+        Args:
+            tournament: Tournament instance
+            system: One of PAIRING_SYSTEMS
+            teams: Two equal-size lists of player IDs (scheveningen only)
+
+        Raises:
+            ValueError: If the system or the teams are invalid
+            RuntimeError: If rounds have already been generated
+        """
+        if system not in PAIRING_SYSTEMS:
+            raise ValueError(f"Unknown pairing system: {system}.")
+        if tournament.rounds:
+            raise RuntimeError("Rounds already generated.")
+        if system == SCHEVENINGEN:
+            if teams is None:
+                if len(tournament.players) % 2 == 1:
+                    raise ValueError("Scheveningen needs an even number of "
+                                     "players to split into two teams.")
+                half = len(tournament.players) // 2
+                teams = [tournament.players[:half],
+                         tournament.players[half:2 * half]]
+            if len(teams) != 2 or len(teams[0]) != len(teams[1]) or not teams[0]:
+                raise ValueError("Scheveningen needs two teams of equal size.")
+        tournament.system = system
+        tournament.teams = teams if system == SCHEVENINGEN else []
+        if system != SWISS:
+            tournament.num_rounds = self.schedule_controller.total_rounds(tournament)
+        save_tournament(tournament)
+
+    @_synchronized
+    def register_players(self, tournament: Tournament,
+                         national_ids: List[str]) -> List[str]:
+        """
+        Register players to a tournament, as one step of its history.
+
+        A round-robin schedule depends on the players, so its number of
+        rounds follows registrations until round 1 and registration is
+        closed afterwards; scheveningen teams are fixed once configured.
+
+        Args:
+            tournament: Tournament instance
+            national_ids: National IDs of players known to the roster
+
+        Returns:
+            National IDs that were not registered yet
+
+        Raises:
+            RuntimeError: If the schedule no longer accepts players
+        """
+        registered = set(tournament.players)
+        new = [nid for nid in dict.fromkeys(national_ids)
+               if nid not in registered]
+        if not new:
+            return new
+        if tournament.system != SWISS and (tournament.rounds
+                                           or tournament.teams):
+            raise RuntimeError("Registration is closed: the schedule is "
+                               "already fixed.")
+        tournament.players.extend(new)
+        if tournament.system != SWISS and tournament.system != SCHEVENINGEN:
+            tournament.num_rounds = self.schedule_controller.total_rounds(
+                tournament)
+        save_tournament(tournament)
+        return new
+
+    @_synchronized
+    def add_section(self, tournament: Tournament, name: str,
+                    players: List[str], system: str = SWISS) -> Section:
+        """
+        Add a section paired independently from the rest of the tournament.
+
+        Args:
+            tournament: Tournament instance
+            name: Section name
+            players: National IDs of registered players in the section
+            system: Pairing system of the section
+
+        Returns:
+            Created Section instance
+
+        Raises:
+            ValueError: If the tournament already has flat rounds, the name
+                is taken, a player is not registered or already in another
+                section, or the system is unknown
+        """
+        if tournament.rounds:
+            raise ValueError("Sections cannot be added once the tournament "
+                             "has rounds.")
+        if system not in PAIRING_SYSTEMS or system == SCHEVENINGEN:
+            raise ValueError(f"Unsupported section pairing system: {system}.")
+        if any(sec.name == name for sec in tournament.sections):
+            raise ValueError(f"Section {name} already exists.")
+        registered = set(tournament.players)
+        taken = {pid for sec in tournament.sections for pid in sec.players}
+        for pid in players:
+            if pid not in registered:
+                raise ValueError(f"{pid} is not registered.")
+            if pid in taken:
+                raise ValueError(f"{pid} is already in another section.")
+        section = Section(name, list(players), tournament.num_rounds, system)
+        if system != SWISS:
+            section.num_rounds = self.schedule_controller.total_rounds(section)
+        tournament.sections.append(section)
+        save_tournament(tournament)
+        return section
+
+    @staticmethod
+    def get_section(tournament: Tournament, name: str) -> Section:
+        """
+        Get a section by name.
+
+        Args:
+            tournament: Tournament instance
+            name: Section name
+
+        Returns:
+            Section instance
+
+        Raises:
+            KeyError: If the section does not exist
+        """
+        for section in tournament.sections:
+            if section.name == name:
+                return section
+        raise KeyError(name)
+
+    @metrics.timed("tournament.generate_sections_round")
+    @_synchronized
+    def generate_sections_round(self, tournament: Tournament,
+                                max_workers: Optional[int] = None
+                                ) -> Dict[str, Round]:
+        """
+        Generate the next round of every unfinished section.
+
+        Sections are paired concurrently on a process pool when the event
+        is large enough, so the wall time is bounded by the largest section.
+
+        Args:
+            tournament: Tournament instance
+            max_workers: Number of worker processes (default: CPU count)
+
+        Returns:
+            Dictionary mapping section names to their new Round
+
+        Raises:
+            RuntimeError: If every section has played all its rounds
+        """
+        pending = [sec for sec in tournament.sections
+                   if sec.current_round < sec.num_rounds]
+        if not pending:
+            raise RuntimeError("Maximum number of rounds reached.")
+        seeds = [random.getrandbits(64) for _ in pending]
+        size = sum(len(sec.players) for sec in pending)
+        if len(pending) > 1 and size >= PARALLEL_MIN_PLAYERS:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(_pair_section, pending, seeds))
+        else:
+            # Inline pairing keeps this controller's compatibility matrices.
+            results = [self.pair_next_round(sec, random.Random(seed))
+                       for sec, seed in zip(pending, seeds)]
+        rounds = {}
+        for section, games in zip(pending, results):
+            rounds[section.name] = self._append_round(section, games)
+        tournament.current_round = max(sec.current_round
+                                       for sec in tournament.sections)
+        save_tournament(tournament)
+        for section in pending:
+            self._notify(tournament, section, section.current_round - 1)
+        return rounds
+
     @staticmethod
     def _calculate_match_points(score1: float, score2: float) -> float:
         """
@@ -30,6 +412,7 @@ class TournamentController:
             return 0.5
         return 0.0
 
+    @metrics.timed("tournament.compute_points")
     def compute_tournament_points(self, tournament: Tournament) -> Dict[str, float]:
         """
         Calculate total points for each player in the tournament.
@@ -46,12 +429,14 @@ class TournamentController:
                 player1, player2 = game[0], game[1]
                 p1_id, s1 = player1[0], player1[1]
                 p2_id, s2 = player2[0], player2[1]
-                if s1 is not None:
+                if s1 is not None and p1_id != "BYE":
                     totals[p1_id] += self._calculate_match_points(s1, s2)
-                if s2 is not None:
+                if s2 is not None and p2_id != "BYE":
                     totals[p2_id] += self._calculate_match_points(s2, s1)
         return totals
 
+    @metrics.timed("tournament.generate_round_one")
+    @_synchronized
     def generate_round_one(self, tournament: Tournament) -> Round:
         """
         Generate the first round with random pairings.
@@ -67,25 +452,13 @@ class TournamentController:
         """
         if tournament.current_round != 0:
             raise RuntimeError("Round 1 already created.")
-        now = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-        players = tournament.players.copy()
-        random.shuffle(players)
-        games = []
-        i = 0
-        while i < len(players) - 1:
-            game = Game(players[i], players[i + 1])
-            games.append(game.to_tuple())
-            i += 2
-        if len(players) % 2 == 1:
-            bye_player = players[-1]
-            games.append(([bye_player, 1.0], ["BYE", 0.0]))
-        rnd = Round(name="Round 1", start_datetime=now)
-        rnd.games = games
-        tournament.rounds.append(rnd)
-        tournament.current_round = 1
+        rnd = self._append_round(tournament, self.pair_next_round(tournament))
         save_tournament(tournament)
+        self._notify(tournament, tournament, tournament.current_round - 1)
         return rnd
 
+    @metrics.timed("tournament.generate_subsequent_round")
+    @_synchronized
     def generate_subsequent_round(self, tournament: Tournament) -> Round:
         """
         Generate a subsequent round using Swiss pairing system.
@@ -101,9 +474,84 @@ class TournamentController:
         """
         if tournament.current_round >= tournament.num_rounds:
             raise RuntimeError("Maximum number of rounds reached.")
-        totals = self.compute_tournament_points(tournament)
+        rnd = self._append_round(tournament, self.pair_next_round(tournament))
+        save_tournament(tournament)
+        self._notify(tournament, tournament, tournament.current_round - 1)
+        return rnd
+
+    def pair_next_round(self, pool, rng: Optional[random.Random] = None,
+                        totals: Optional[Dict[str, float]] = None,
+                        matrix: Optional[CompatibilityMatrix] = None
+                        ) -> List[list]:
+        """
+        Compute the games of the next round without modifying the pool.
+
+        Args:
+            pool: Tournament or Section (players, rounds, current_round,
+                system and teams are used)
+            rng: Random generator for the shuffles (default: the random
+                module)
+            totals: Points of each player, if already known
+            matrix: Up-to-date compatibility matrix of the pool, if already
+                built
+
+        Returns:
+            List of games [[player_id, score], [player_id, score]]
+        """
+        if pool.system != SWISS:
+            return self.schedule_controller.round_games(pool, pool.current_round)
+        if pool.current_round == 0:
+            return self.pair_round_one(pool, rng)
+        return self.pair_subsequent_round(pool, rng, totals, matrix)
+
+    @staticmethod
+    def pair_round_one(pool, rng: Optional[random.Random] = None) -> List[list]:
+        """
+        Compute random pairings for the first round.
+
+        Args:
+            pool: Tournament or Section
+            rng: Random generator (default: the random module)
+
+        Returns:
+            List of games
+        """
+        players = pool.players.copy()
+        (rng or random).shuffle(players)
+        games = []
+        i = 0
+        while i < len(players) - 1:
+            game = Game(players[i], players[i + 1])
+            games.append(game.to_tuple())
+            i += 2
+        if len(players) % 2 == 1:
+            bye_player = players[-1]
+            games.append(([bye_player, 1.0], ["BYE", 0.0]))
+        return games
+
+    def pair_subsequent_round(self, pool,
+                              rng: Optional[random.Random] = None,
+                              totals: Optional[Dict[str, float]] = None,
+                              matrix: Optional[CompatibilityMatrix] = None
+                              ) -> List[list]:
+        """
+        Compute Swiss pairings from the standings and pairing history.
+
+        Args:
+            pool: Tournament or Section
+            rng: Random generator (default: the random module)
+            totals: Points of each player (default: computed from the
+                rounds)
+            matrix: Up-to-date compatibility matrix (default: the cached
+                matrix of the pool)
+
+        Returns:
+            List of games
+        """
+        if totals is None:
+            totals = self.compute_tournament_points(pool)
         players_sorted = sorted(
-            tournament.players,
+            pool.players,
             key=lambda pid: (-totals.get(pid, 0.0), pid)
         )
         grouped = []
@@ -116,48 +564,115 @@ class TournamentController:
                    totals.get(players_sorted[i], 0.0)):
                 same.append(players_sorted[j])
                 j += 1
-            random.shuffle(same)
+            (rng or random).shuffle(same)
             grouped.extend(same)
             i = j
         players = grouped
-        played_pairs = set()
-        for rnd in tournament.rounds:
-            for match in rnd.games:
-                a, b = match[0][0], match[1][0]
-                if a != "BYE" and b != "BYE":
-                    played_pairs.add(frozenset({a, b}))
-        matches = []
-        i = 0
-        while i < len(players) - 1:
-            p1 = players[i]
-            p2 = players[i + 1]
-            if frozenset({p1, p2}) in played_pairs:
-                swapped = False
-                for j in range(i + 2, len(players)):
-                    if frozenset({p1, players[j]}) not in played_pairs:
-                        players[i + 1], players[j] = players[j], players[i + 1]
-                        swapped = True
-                        break
-            matches.append([[p1, None], [players[i + 1], None]])
-            played_pairs.add(frozenset({p1, players[i + 1]}))
-            i += 2
-        if len(players) % 2 == 1:
-            last = players[-1]
-            matches.append([[last, 1.0], ["BYE", 0.0]])
+        if matrix is None:
+            matrix = self._matrix_for(pool)
+        ranked = [matrix.index[pid] for pid in players]
+        bye_candidates = [None]
+        if len(ranked) % 2 == 1:
+            fresh = [i for i in reversed(ranked) if not matrix.had_bye(i)]
+            bye_candidates = (fresh or [ranked[-1]])[:MAX_BYE_TRIES]
+        for use_colours, allow_rematch in PAIRING_TIERS:
+            for bye in bye_candidates:
+                order = [i for i in ranked if i != bye]
+                view = matrix.rank_view(order, use_colours, allow_rematch)
+                pairs = self._search_pairings(view)
+                if pairs is None:
+                    continue
+                matches = []
+                for p, q in pairs:
+                    white, black = matrix.allocate_colours(order[p], order[q])
+                    matches.append([[matrix.players[white], None],
+                                    [matrix.players[black], None]])
+                if bye is not None:
+                    matches.append([[matrix.players[bye], 1.0], ["BYE", 0.0]])
+                return matches
+        raise RuntimeError("No valid pairing found.")
+
+    def _matrix_for(self, pool) -> CompatibilityMatrix:
+        """
+        Get the compatibility matrix of a pool, applying only new rounds.
+
+        Args:
+            pool: Tournament or Section
+
+        Returns:
+            Up-to-date CompatibilityMatrix
+        """
+        matrix = self._matrices.get(pool)
+        if matrix is None or not matrix.is_current(pool.players, pool.rounds):
+            matrix = CompatibilityMatrix(pool.players)
+            self._matrices[pool] = matrix
+        for rnd in pool.rounds[len(matrix.rounds):]:
+            matrix.apply_round(rnd)
+        return matrix
+
+    @staticmethod
+    def _search_pairings(view: List[int],
+                         budget: int = SEARCH_BUDGET
+                         ) -> Optional[List[Tuple[int, int]]]:
+        """
+        Pair every ranking position using a compatibility bit-matrix.
+
+        Depth-first search: the best-ranked unpaired player takes the
+        best-ranked compatible opponent (lowest set bit); a player left
+        without any compatible opponent prunes the branch immediately.
+
+        Args:
+            view: Compatibility bitmasks in ranking order
+            budget: Maximum number of backtracking steps
+
+        Returns:
+            List of (rank, rank) pairs, or None if none was found in budget
+        """
+        remaining = (1 << len(view)) - 1
+        stack = []
+        floor = 0
+        while remaining:
+            p = (remaining & -remaining).bit_length() - 1
+            candidates = view[p] & remaining & ~((1 << floor) - 1)
+            if candidates:
+                q = (candidates & -candidates).bit_length() - 1
+                stack.append((p, q))
+                remaining &= ~((1 << p) | (1 << q))
+                floor = 0
+                continue
+            if not stack or budget <= 0:
+                return None
+            budget -= 1
+            p, q = stack.pop()
+            remaining |= (1 << p) | (1 << q)
+            floor = q + 1
+        return stack
+
+    @staticmethod
+    def _append_round(pool, games: List[list]) -> Round:
+        """
+        Create the next round from its games and append it to the pool.
+
+        Args:
+            pool: Tournament or Section
+            games: Games of the round
+
+        Returns:
+            Created Round instance
+        """
         now = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-        rnd = Round(
-            name=f"Round {tournament.current_round + 1}",
-            start_datetime=now
-        )
-        rnd.games = matches
-        tournament.rounds.append(rnd)
-        tournament.current_round += 1
-        save_tournament(tournament)
+        rnd = Round(name=f"Round {pool.current_round + 1}", start_datetime=now)
+        rnd.games = games
+        pool.rounds.append(rnd)
+        pool.current_round += 1
         return rnd
 
+    @metrics.timed("tournament.enter_scores")
+    @_synchronized
     def enter_scores_for_round(self, tournament: Tournament,
                                 round_index: int,
-                                scores: Dict[int, tuple]) -> None:
+                                scores: Dict[int, tuple],
+                                section_name: Optional[str] = None) -> None:
         """
         Enter scores for a specific round.
 
@@ -165,13 +680,18 @@ class TournamentController:
             tournament: Tournament instance
             round_index: Index of the round
             scores: Dictionary mapping game index to (score1, score2) tuple
+            section_name: Section of the round (None for a flat tournament)
 
         Raises:
             IndexError: If round index is invalid
+            KeyError: If the section does not exist
         """
-        if round_index < 0 or round_index >= len(tournament.rounds):
+        pool = tournament
+        if section_name is not None:
+            pool = self.get_section(tournament, section_name)
+        if round_index < 0 or round_index >= len(pool.rounds):
             raise IndexError("Invalid round index.")
-        rnd = tournament.rounds[round_index]
+        rnd = pool.rounds[round_index]
         for gi, (s1, s2) in scores.items():
             if gi < 0 or gi >= len(rnd.games):
                 continue
@@ -179,3 +699,4 @@ class TournamentController:
             rnd.games[gi][1][1] = s2
         rnd.end_datetime = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
         save_tournament(tournament)
+        self._notify(tournament, pool, round_index)
@@ -1,5 +1,80 @@
-from controllers.app_controller import AppController
+import argparse
+import os
+import sys
+
+
+def parse_args():
+    """
+    Parse command-line options.
+
+    Anything that is not an option of the interactive program is left
+    for the batch subcommands (create, register, pair, ...).
+
+    Returns:
+        (argparse.Namespace with the parsed options, subcommand arguments)
+    """
+    parser = argparse.ArgumentParser(
+        description="Centre échecs",
+        epilog="Sans sous-commande, le menu interactif s'ouvre. "
+               "Sous-commandes (sortie JSON): add-player, create, register, "
+               "pair, enter-results, standings, script.",
+        allow_abbrev=False)
+    parser.add_argument("--metrics", nargs="?", const="", metavar="FICHIER",
+                        help="mesurer les opérations (rapport JSON si FICHIER)")
+    parser.add_argument("--profile", metavar="FICHIER",
+                        help="écrire un profil cProfile dans FICHIER")
+    parser.add_argument("--live-dir", metavar="DOSSIER",
+                        help="publier classements et appariements en direct "
+                             "dans DOSSIER (fichiers JSON)")
+    parser.add_argument("--live-port", type=int, metavar="PORT",
+                        help="publier en direct sur un port TCP local")
+    parser.add_argument("--verify", action="store_true",
+                        help="vérifier l'intégrité des données et quitter "
+                             "(code de sortie 1 en cas de problème)")
+    return parser.parse_known_args()
+
 
 if __name__ == "__main__":
+    args, command = parse_args()
+    if args.metrics is not None:
+        # must be set before the controllers import utils.metrics
+        os.environ["CHESS_METRICS"] = "1"
+        if args.metrics:
+            os.environ["CHESS_METRICS_FILE"] = args.metrics
+    from controllers.app_controller import AppController
     controller = AppController()
-    controller. run_cli()
\ No newline at end of file
+    if args.verify:
+        from storage.verify import verify_archive
+        violations = verify_archive()
+        controller.view.display_violations(violations)
+        sys.exit(1 if violations else 0)
+    if args.live_dir or args.live_port is not None:
+        from controllers.live_controller import (LiveController, FileSink,
+                                                 SocketSink)
+        live = LiveController(controller.tournament_controller)
+        if args.live_dir:
+            live.add_sink(FileSink(args.live_dir))
+        if args.live_port is not None:
+            sink = SocketSink(port=args.live_port)
+            live.add_sink(sink)
+            # stdout carries the JSON results in batch mode
+            print(f"Publication en direct sur {sink.address[0]}:"
+                  f"{sink.address[1]}",
+                  file=sys.stderr if command else sys.stdout)
+        controller.live_controller = live
+    run = controller.run_cli
+    if command:
+        from functools import partial
+        from controllers.batch_controller import BatchController
+        run = partial(BatchController(controller).run, command)
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            status = profiler.runcall(run)
+        finally:
+            profiler.dump_stats(args.profile)
+    else:
+        status = run()
+    if command:
+        sys.exit(status)
@@ -4,11 +4,19 @@ from datetime import datetime
 from typing import List, Tuple, Optional
 
 
+SWISS = "swiss"
+ROUND_ROBIN = "round_robin"
+DOUBLE_ROUND_ROBIN = "double_round_robin"
+SCHEVENINGEN = "scheveningen"
+PAIRING_SYSTEMS = (SWISS, ROUND_ROBIN, DOUBLE_ROUND_ROBIN, SCHEVENINGEN)
+
+
 class Player:
     """Represents a chess player."""
 
     def __init__(self, last_name: str, first_name: str,
-                 birth_date: str, national_id: str):
+                 birth_date: str, national_id: str,
+                 rating: Optional[int] = None):
         """
         Initialize a player.
 
@@ -17,11 +25,13 @@ class Player:
             first_name: Player's first name
             birth_date: Birth date in DD/MM/YYYY format
             national_id: National chess ID (format: AB12345)
+            rating: Elo rating (optional)
         """
         self.last_name = last_name
         self.first_name = first_name
         self.birth_date = birth_date
         self.national_id = national_id
+        self.rating = rating
 
     def to_dict(self) -> dict:
         """
@@ -35,6 +45,7 @@ class Player:
             "first_name": self.first_name,
             "birth_date": self.birth_date,
             "national_id": self.national_id,
+            "rating": self.rating,
         }
 
     @classmethod
@@ -49,7 +60,7 @@ class Player:
             Player instance
         """
         return cls(d["last_name"], d["first_name"], d["birth_date"],
-                   d["national_id"])
+                   d["national_id"], d.get("rating"))
 
 
 class Game:
@@ -151,6 +162,64 @@ class Round:
         return r
 
 
+class Section:
+    """Represents an independently paired section of a tournament."""
+
+    def __init__(self, name: str, players: Optional[List[str]] = None,
+                 num_rounds: int = 4, system: str = SWISS):
+        """
+        Initialize a section.
+
+        Args:
+            name: Section name (e.g., "Open A", "U12")
+            players: National IDs of the players in the section
+            num_rounds: Number of rounds (default: 4)
+            system: Pairing system (default: swiss)
+        """
+        self.name = name
+        self.players: List[str] = players if players is not None else []
+        self.num_rounds = num_rounds
+        self.system = system
+        self.teams: List[List[str]] = []
+        self.current_round = 0
+        self.rounds: List[Round] = []
+
+    def to_dict(self) -> dict:
+        """
+        Convert section to dictionary for serialization.
+
+        Returns:
+            Dictionary representation of the section
+        """
+        return {
+            "name": self.name,
+            "players": self.players,
+            "num_rounds": self.num_rounds,
+            "system": self.system,
+            "teams": self.teams,
+            "current_round": self.current_round,
+            "rounds": [r.to_dict() for r in self.rounds],
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        """
+        Create Section instance from dictionary.
+
+        Args:
+            d: Dictionary containing section data
+
+        Returns:
+            Section instance
+        """
+        s = cls(d["name"], d.get("players", []), d.get("num_rounds", 4),
+                d.get("system", SWISS))
+        s.teams = d.get("teams", [])
+        s.current_round = d.get("current_round", 0)
+        s.rounds = [Round.from_dict(rd) for rd in d.get("rounds", [])]
+        return s
+
+
 class Tournament:
     """Represents a chess tournament."""
 
@@ -176,6 +245,9 @@ class Tournament:
         self.rounds: List[Round] = []
         self.players: List[str] = []
         self.description = description
+        self.system = SWISS
+        self.teams: List[List[str]] = []
+        self.sections: List[Section] = []
 
     def to_dict(self) -> dict:
         """
@@ -194,6 +266,9 @@ class Tournament:
             "rounds": [r.to_dict() for r in self.rounds],
             "players": self.players,
             "description": self.description,
+            "system": self.system,
+            "teams": self.teams,
+            "sections": [s.to_dict() for s in self.sections],
         }
 
     @classmethod
@@ -212,4 +287,7 @@ class Tournament:
         t.current_round = d.get("current_round", 0)
         t.players = d.get("players", [])
         t.rounds = [Round.from_dict(rd) for rd in d.get("rounds", [])]
+        t.system = d.get("system", SWISS)
+        t.teams = d.get("teams", [])
+        t.sections = [Section.from_dict(sd) for sd in d.get("sections", [])]
         return t
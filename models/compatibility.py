@@ -0,0 +1,186 @@
+"""Compatibility matrix used by the constraint-aware Swiss pairing."""
+
+from typing import Dict, List, Tuple
+from models.classes import Round
+
+
+BYE = "BYE"
+WHITE = "W"
+BLACK = "B"
+# Absolute colour limits: no colour difference beyond +/-2 and never the
+# same colour three rounds in a row.
+MAX_COLOUR_DIFF = 2
+
+
+class CompatibilityMatrix:
+    """
+    Pairing constraints of a pool of players, updated round by round.
+
+    Opponents already met are stored as one integer bitmask per player
+    (bit i set = player i already met), alongside each player's colour
+    history and whether they already received a bye. Applying a round
+    only touches the players of that round.
+    """
+
+    def __init__(self, players: List[str]):
+        """
+        Initialize an empty matrix.
+
+        Args:
+            players: Player IDs of the pool
+        """
+        self.players = list(players)
+        self.index: Dict[str, int] = {pid: i for i, pid in enumerate(players)}
+        n = len(self.players)
+        self.played = [0] * n
+        self.opponents: List[List[int]] = [[] for _ in range(n)]
+        self.colour_diff = [0] * n
+        self.colours = [""] * n
+        self.byes = 0
+        self.rounds: List[Round] = []
+
+    def is_current(self, players: List[str], rounds: List[Round]) -> bool:
+        """
+        Check whether the matrix can be brought up to date incrementally.
+
+        Args:
+            players: Player IDs of the pool
+            rounds: Rounds of the pool
+
+        Returns:
+            True if the pool has the same players and every applied round
+            is still in place (new rounds may follow)
+        """
+        if players != self.players or len(rounds) < len(self.rounds):
+            return False
+        return all(a is b for a, b in zip(self.rounds, rounds))
+
+    def copy(self) -> "CompatibilityMatrix":
+        """
+        Copy the matrix so rounds can be applied to the copy only.
+
+        Returns:
+            Independent CompatibilityMatrix with the same state
+        """
+        clone = CompatibilityMatrix.__new__(CompatibilityMatrix)
+        clone.players = self.players
+        clone.index = self.index
+        clone.played = list(self.played)
+        clone.opponents = [list(o) for o in self.opponents]
+        clone.colour_diff = list(self.colour_diff)
+        clone.colours = list(self.colours)
+        clone.byes = self.byes
+        clone.rounds = list(self.rounds)
+        return clone
+
+    def apply_round(self, rnd: Round) -> None:
+        """
+        Record the pairings and colours of a round.
+
+        Args:
+            rnd: Round to apply (player1 has white)
+        """
+        for game in rnd.games:
+            white, black = game[0][0], game[1][0]
+            if black == BYE or white == BYE:
+                pid = white if black == BYE else black
+                if pid in self.index:
+                    self.byes |= 1 << self.index[pid]
+                continue
+            if white not in self.index or black not in self.index:
+                continue
+            w, b = self.index[white], self.index[black]
+            self.played[w] |= 1 << b
+            self.played[b] |= 1 << w
+            self.opponents[w].append(b)
+            self.opponents[b].append(w)
+            self.colour_diff[w] += 1
+            self.colour_diff[b] -= 1
+            self.colours[w] = self.colours[w][-1:] + WHITE
+            self.colours[b] = self.colours[b][-1:] + BLACK
+        self.rounds.append(rnd)
+
+    def had_bye(self, i: int) -> bool:
+        """
+        Check whether a player already received a bye.
+
+        Args:
+            i: Player index
+
+        Returns:
+            True if the player had a bye
+        """
+        return bool(self.byes >> i & 1)
+
+    def must_white(self, i: int) -> bool:
+        """Return True if the player can only be given white."""
+        return (self.colour_diff[i] <= -MAX_COLOUR_DIFF
+                or self.colours[i] == BLACK * 2)
+
+    def must_black(self, i: int) -> bool:
+        """Return True if the player can only be given black."""
+        return (self.colour_diff[i] >= MAX_COLOUR_DIFF
+                or self.colours[i] == WHITE * 2)
+
+    def rank_view(self, ranked: List[int], use_colours: bool = True,
+                  allow_rematch: bool = False) -> List[int]:
+        """
+        Build the compatibility bit-matrix in ranking order.
+
+        Bit q of entry r is set when the players ranked r and q may be
+        paired, so the best-ranked compatible opponent is the lowest set
+        bit.
+
+        Args:
+            ranked: Player indices in pairing order
+            use_colours: Forbid pairs that both need the same colour
+            allow_rematch: Allow players to meet again
+
+        Returns:
+            List of bitmasks, one per ranking position
+        """
+        rank_of = {i: r for r, i in enumerate(ranked)}
+        full = (1 << len(ranked)) - 1
+        white_only = black_only = 0
+        if use_colours:
+            for r, i in enumerate(ranked):
+                if self.must_white(i):
+                    white_only |= 1 << r
+                elif self.must_black(i):
+                    black_only |= 1 << r
+        view = []
+        for r, i in enumerate(ranked):
+            allowed = full & ~(1 << r)
+            if not allow_rematch:
+                for o in self.opponents[i]:
+                    q = rank_of.get(o)
+                    if q is not None:
+                        allowed &= ~(1 << q)
+            if white_only >> r & 1:
+                allowed &= ~white_only
+            elif black_only >> r & 1:
+                allowed &= ~black_only
+            view.append(allowed)
+        return view
+
+    def allocate_colours(self, a: int, b: int) -> Tuple[int, int]:
+        """
+        Choose colours for a pair, higher-ranked player first.
+
+        Args:
+            a: Index of the higher-ranked player
+            b: Index of the lower-ranked player
+
+        Returns:
+            (white_index, black_index)
+        """
+        if self.must_white(a) or self.must_black(b):
+            return a, b
+        if self.must_white(b) or self.must_black(a):
+            return b, a
+        if self.colour_diff[a] != self.colour_diff[b]:
+            return (a, b) if self.colour_diff[a] < self.colour_diff[b] else (b, a)
+        last_a, last_b = self.colours[a][-1:], self.colours[b][-1:]
+        if last_a != last_b:
+            return (a, b) if last_a != WHITE else (b, a)
+        return (b, a) if last_a == WHITE else (a, b)
@@ -0,0 +1,274 @@
+"""Versioned tournament state for undo, redo and round rollback."""
+
+import hashlib
+import json
+from typing import Callable, Dict, List, Optional, Tuple
+from models.classes import Tournament, Section, Round
+
+
+MAX_HISTORY = 100
+
+
+def _same_round(rnd: Round, frozen: tuple) -> bool:
+    """Check whether a round still matches its frozen copy."""
+    if (rnd.name, rnd.start_datetime, rnd.end_datetime) != frozen[:3]:
+        return False
+    games = frozen[3]
+    if len(rnd.games) != len(games):
+        return False
+    for g, f in zip(rnd.games, games):
+        if (g[0][0] != f[0][0] or g[0][1] != f[0][1]
+                or g[1][0] != f[1][0] or g[1][1] != f[1][1]):
+            return False
+    return True
+
+
+def _freeze_game(game, previous: Optional[tuple]) -> tuple:
+    """Freeze a game, reusing the previous tuple if unchanged."""
+    if (previous is not None and game[0][0] == previous[0][0]
+            and game[0][1] == previous[0][1] and game[1][0] == previous[1][0]
+            and game[1][1] == previous[1][1]):
+        return previous
+    return (tuple(game[0]), tuple(game[1]))
+
+
+def _freeze_rounds(rounds: List[Round], previous: tuple) -> tuple:
+    """Freeze rounds, sharing every round and game that did not change."""
+    frozen = []
+    for i, rnd in enumerate(rounds):
+        if i < len(previous) and _same_round(rnd, previous[i]):
+            frozen.append(previous[i])
+            continue
+        games = previous[i][3] if i < len(previous) else ()
+        frozen.append((rnd.name, rnd.start_datetime, rnd.end_datetime,
+                       tuple(_freeze_game(g, games[gi] if gi < len(games)
+                                          else None)
+                             for gi, g in enumerate(rnd.games))))
+    return tuple(frozen)
+
+
+def _freeze_list(values: list, previous: Optional[tuple]) -> tuple:
+    """Freeze a list of IDs, reusing the previous tuple if unchanged."""
+    if (previous is not None and len(previous) == len(values)
+            and all(a == b for a, b in zip(previous, values))):
+        return previous
+    return tuple(values)
+
+
+def _freeze_pool(pool, previous: Optional[dict]) -> dict:
+    """Freeze the pairing state shared by tournaments and sections."""
+    previous = previous or {}
+    return {
+        "players": _freeze_list(pool.players, previous.get("players")),
+        "num_rounds": pool.num_rounds,
+        "current_round": pool.current_round,
+        "system": pool.system,
+        "teams": tuple(tuple(team) for team in pool.teams),
+        "rounds": _freeze_rounds(pool.rounds, previous.get("rounds", ())),
+    }
+
+
+def freeze_tournament(tournament: Tournament,
+                      previous: Optional[dict] = None) -> dict:
+    """
+    Take an immutable snapshot of a tournament's evolving state.
+
+    Rounds and player lists that did not change since ``previous`` are
+    shared with it, so a long history costs little more than one copy.
+
+    Args:
+        tournament: Tournament instance
+        previous: Snapshot to share structure with
+
+    Returns:
+        Snapshot dictionary made of tuples
+    """
+    snapshot = _freeze_pool(tournament, previous)
+    previous_sections = {s["name"]: s for s in
+                         (previous or {}).get("sections", ())}
+    sections = []
+    for section in tournament.sections:
+        frozen = _freeze_pool(section, previous_sections.get(section.name))
+        frozen["name"] = section.name
+        sections.append(frozen)
+    snapshot["sections"] = tuple(sections)
+    return snapshot
+
+
+def _thaw_pool(pool, snapshot: dict) -> None:
+    """Restore the pairing state of a tournament or section."""
+    pool.players = list(snapshot["players"])
+    pool.num_rounds = snapshot["num_rounds"]
+    pool.current_round = snapshot["current_round"]
+    pool.system = snapshot["system"]
+    pool.teams = [list(team) for team in snapshot["teams"]]
+    pool.rounds = []
+    for name, start, end, games in snapshot["rounds"]:
+        rnd = Round(name, start, end)
+        rnd.games = [([g[0][0], g[0][1]], [g[1][0], g[1][1]]) for g in games]
+        pool.rounds.append(rnd)
+
+
+def thaw_into(tournament: Tournament, snapshot: dict) -> None:
+    """
+    Restore a snapshot into a tournament, in place.
+
+    Args:
+        tournament: Tournament instance
+        snapshot: Snapshot from freeze_tournament
+    """
+    _thaw_pool(tournament, snapshot)
+    tournament.sections = []
+    for frozen in snapshot["sections"]:
+        section = Section(frozen["name"])
+        _thaw_pool(section, frozen)
+        tournament.sections.append(section)
+
+
+class TournamentHistory:
+    """Undo and redo stacks of tournament snapshots."""
+
+    def __init__(self):
+        """Initialize empty stacks."""
+        self.undo_stack: List[dict] = []
+        self.redo_stack: List[dict] = []
+        self._keys: Dict[int, tuple] = {}
+
+    def latest(self) -> Optional[dict]:
+        """
+        Get the most recent snapshot, to share structure with.
+
+        Returns:
+            Last undo snapshot, or None
+        """
+        return self.undo_stack[-1] if self.undo_stack else None
+
+    def record(self, snapshot: dict) -> None:
+        """
+        Record the state before a change; clears the redo stack.
+
+        Args:
+            snapshot: State before the change
+        """
+        self.undo_stack.append(snapshot)
+        del self.undo_stack[:-MAX_HISTORY]
+        self.redo_stack.clear()
+
+    def _key(self, obj) -> str:
+        """Get the content key of a frozen round or player list."""
+        cached = self._keys.get(id(obj))
+        if cached is None:
+            data = json.dumps(self.encode_object(obj), sort_keys=True,
+                              ensure_ascii=False)
+            cached = (obj, hashlib.sha1(data.encode("utf-8")).hexdigest())
+            self._keys[id(obj)] = cached
+        return cached[1]
+
+    @staticmethod
+    def encode_object(obj) -> object:
+        """
+        Convert a frozen round or player list to JSON-serialisable data.
+
+        Args:
+            obj: Frozen round tuple or player ID tuple
+
+        Returns:
+            Round dictionary or list of player IDs
+        """
+        if obj and isinstance(obj[0], str) and len(obj) == 4 \
+                and isinstance(obj[3], tuple):
+            return {"name": obj[0], "start_datetime": obj[1],
+                    "end_datetime": obj[2],
+                    "games": [{"player1": list(g[0]), "player2": list(g[1])}
+                              for g in obj[3]]}
+        return list(obj)
+
+    def export(self) -> Tuple[dict, Dict[str, object]]:
+        """
+        Convert history to an index and the objects it references.
+
+        Rounds and player lists are referenced by content key, so parts
+        shared between snapshots are stored once.
+
+        Returns:
+            (index dictionary, objects keyed by content key)
+        """
+        objects = {}
+
+        def ref(obj):
+            key = self._key(obj)
+            objects[key] = obj
+            return key
+
+        def encode_pool(p):
+            d = {"players": ref(p["players"]),
+                 "num_rounds": p["num_rounds"],
+                 "current_round": p["current_round"],
+                 "system": p["system"],
+                 "teams": [list(t) for t in p["teams"]],
+                 "rounds": [ref(r) for r in p["rounds"]]}
+            if "name" in p:
+                d["name"] = p["name"]
+            return d
+
+        def encode(snapshot):
+            d = encode_pool(snapshot)
+            d["sections"] = [encode_pool(x) for x in snapshot["sections"]]
+            return d
+
+        index = {"undo": [encode(x) for x in self.undo_stack],
+                 "redo": [encode(x) for x in self.redo_stack]}
+        # Forget the keys of objects no snapshot references any more.
+        live = {id(obj) for obj in objects.values()}
+        self._keys = {i: v for i, v in self._keys.items() if i in live}
+        return index, objects
+
+    @classmethod
+    def from_index(cls, index: dict, load_object: Callable[[str], object]):
+        """
+        Create TournamentHistory instance from an index.
+
+        Args:
+            index: Index dictionary from export
+            load_object: Returns the stored data of a content key
+
+        Returns:
+            TournamentHistory instance (shared parts are shared again)
+        """
+        h = cls()
+        memo = {}
+
+        def obj(key, decode):
+            if key not in memo:
+                memo[key] = decode(load_object(key))
+                h._keys[id(memo[key])] = (memo[key], key)
+            return memo[key]
+
+        games = {}
+
+        def decode_round(r):
+            # Equal games of different versions of a round are shared too.
+            return (r["name"], r["start_datetime"], r["end_datetime"],
+                    tuple(games.setdefault(g, g) for g in
+                          ((tuple(g["player1"]), tuple(g["player2"]))
+                           for g in r["games"])))
+
+        def decode_pool(p):
+            s = {"players": obj(p["players"], tuple),
+                 "num_rounds": p["num_rounds"],
+                 "current_round": p["current_round"],
+                 "system": p["system"],
+                 "teams": tuple(tuple(t) for t in p["teams"]),
+                 "rounds": tuple(obj(k, decode_round) for k in p["rounds"])}
+            if "name" in p:
+                s["name"] = p["name"]
+            return s
+
+        def decode(p):
+            s = decode_pool(p)
+            s["sections"] = tuple(decode_pool(x) for x in p["sections"])
+            return s
+
+        h.undo_stack = [decode(x) for x in index.get("undo", [])]
+        h.redo_stack = [decode(x) for x in index.get("redo", [])]
+        return h
@@ -0,0 +1,220 @@
+"""Export of every stored game as flat rows for analytics."""
+
+import csv
+import json
+import os
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+from models.classes import Tournament
+from storage.save import (get_data_dir, list_tournament_files,
+                          load_tournament, get_tournament_generation)
+from utils import metrics
+
+
+COLUMNS = ("tournament", "section", "round", "board", "white", "black",
+           "white_score", "black_score", "round_start", "round_end")
+FORMATS = ("csv", "parquet")
+MANIFEST_NAME = "manifest.json"
+# Layout of the exported rows; exports written with another version are
+# rewritten even if their tournament did not change.
+EXPORT_VERSION = 2
+# Rows buffered before a Parquet row group is written.
+CHUNK_ROWS = 10000
+
+
+def get_exports_dir() -> Path:
+    """
+    Get the default directory of exported files.
+
+    Returns:
+        Path to the exports directory inside the data directory
+    """
+    return get_data_dir() / "exports"
+
+
+def iter_game_rows(tournament: Tournament) -> Iterator[Tuple]:
+    """
+    Iterate over every game of a tournament as a flat row.
+
+    Args:
+        tournament: Tournament instance
+
+    Yields:
+        Tuples ordered as COLUMNS (section is "" for flat tournaments;
+        boards are numbered from 0, as in result entry and live diffs)
+    """
+    pools = [("", tournament)] + [(s.name, s) for s in tournament.sections]
+    for section, pool in pools:
+        for rnd in pool.rounds:
+            for board, game in enumerate(rnd.games):
+                white, black = game[0], game[1]
+                yield (tournament.name, section, rnd.name, board,
+                       white[0], black[0], white[1], black[1],
+                       rnd.start_datetime, rnd.end_datetime)
+
+
+def _write_csv(rows: Iterator[Tuple], path: Path) -> int:
+    """
+    Stream rows into a CSV file.
+
+    Args:
+        rows: Rows ordered as COLUMNS
+        path: Destination file
+
+    Returns:
+        Number of rows written
+    """
+    count = 0
+    with path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for row in rows:
+            writer.writerow(["" if v is None else v for v in row])
+            count += 1
+    return count
+
+
+def _write_parquet(rows: Iterator[Tuple], path: Path,
+                   chunk_rows: int) -> int:
+    """
+    Stream rows into a Parquet file, one row group per chunk.
+
+    Args:
+        rows: Rows ordered as COLUMNS
+        path: Destination file
+        chunk_rows: Rows per row group
+
+    Returns:
+        Number of rows written
+    """
+    # Imported here so that starting the application never pays for it.
+    import pyarrow
+    import pyarrow.parquet as pq
+    schema = pyarrow.schema([
+        ("tournament", pyarrow.string()), ("section", pyarrow.string()),
+        ("round", pyarrow.string()), ("board", pyarrow.int32()),
+        ("white", pyarrow.string()), ("black", pyarrow.string()),
+        ("white_score", pyarrow.float64()), ("black_score", pyarrow.float64()),
+        ("round_start", pyarrow.string()), ("round_end", pyarrow.string()),
+    ])
+    count = 0
+    with pq.ParquetWriter(str(path), schema) as writer:
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_rows:
+                writer.write_table(_chunk_table(chunk, schema))
+                count += len(chunk)
+                chunk = []
+        if chunk or not count:
+            writer.write_table(_chunk_table(chunk, schema))
+            count += len(chunk)
+    return count
+
+
+def _chunk_table(chunk, schema):
+    """Convert a list of rows into a pyarrow table (column by column)."""
+    import pyarrow
+    columns = list(zip(*chunk)) if chunk else [[] for _ in COLUMNS]
+    return pyarrow.Table.from_arrays(
+        [pyarrow.array(col, type=field.type)
+         for col, field in zip(columns, schema)],
+        schema=schema,
+    )
+
+
+def _atomic(path: Path, write) -> int:
+    """Run a writer into a temporary file, then move it into place."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    count = write(tmp)
+    os.replace(tmp, path)
+    return count
+
+
+@metrics.timed("export.archive")
+def export_archive(output_dir: Optional[Path] = None,
+                   formats: Tuple[str, ...] = ("csv",),
+                   chunk_rows: int = CHUNK_ROWS) -> dict:
+    """
+    Export every game of the archive, one file per tournament and format.
+
+    Only tournaments whose file changed since the previous export are
+    rewritten; exports of deleted tournaments, and of formats no longer
+    requested, are removed. Tournaments are loaded one at a time and rows
+    are streamed, so memory stays flat. A tournament file that cannot be
+    read is reported and skipped.
+
+    Args:
+        output_dir: Destination directory (default: data/exports)
+        formats: Formats to write, among FORMATS
+        chunk_rows: Rows per Parquet row group
+
+    Returns:
+        Dictionary with the lists of "exported", "skipped", "removed" and
+        "failed" tournament files and the number of "rows" written (per
+        format)
+
+    Raises:
+        ValueError: If a format is unknown
+        RuntimeError: If Parquet is requested but pyarrow is not installed
+    """
+    for fmt in formats:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}.")
+    if "parquet" in formats:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:  # Parquet export is optional
+            raise RuntimeError("pyarrow is required for Parquet export.") \
+                from None
+    out = Path(output_dir) if output_dir is not None else get_exports_dir()
+    out.mkdir(parents=True, exist_ok=True)
+    manifest_path = out / MANIFEST_NAME
+    manifest = {}
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    report = {"exported": [], "skipped": [], "removed": [], "failed": [],
+              "rows": 0}
+    files = list_tournament_files()
+    for file_name in files:
+        stem = Path(file_name).stem
+        generation = list(get_tournament_generation(file_name) or [])
+        targets = {fmt: out / f"{stem}.{fmt}" for fmt in formats}
+        entry = manifest.get(file_name, {})
+        for fmt in set(entry.get("formats", [])) - set(formats):
+            (out / f"{stem}.{fmt}").unlink(missing_ok=True)
+        if (entry.get("generation") == generation
+                and entry.get("version") == EXPORT_VERSION
+                and all(fmt in entry.get("formats", []) and p.exists()
+                        for fmt, p in targets.items())):
+            if set(entry["formats"]) != set(formats):
+                manifest[file_name] = {"generation": generation,
+                                       "version": EXPORT_VERSION,
+                                       "formats": list(formats)}
+            report["skipped"].append(file_name)
+            continue
+        try:
+            tournament = load_tournament(file_name)
+        except (OSError, ValueError, KeyError, TypeError):
+            report["failed"].append(file_name)
+            continue
+        for fmt, path in targets.items():
+            rows = iter_game_rows(tournament)
+            if fmt == "csv":
+                n = _atomic(path, lambda p: _write_csv(rows, p))
+            else:
+                n = _atomic(path, lambda p: _write_parquet(rows, p,
+                                                           chunk_rows))
+            report["rows"] += n
+        manifest[file_name] = {"generation": generation,
+                               "version": EXPORT_VERSION,
+                               "formats": list(formats)}
+        report["exported"].append(file_name)
+    for file_name in set(manifest) - set(files):
+        for fmt in FORMATS:
+            (out / f"{Path(file_name).stem}.{fmt}").unlink(missing_ok=True)
+        del manifest[file_name]
+        report["removed"].append(file_name)
+    _atomic(manifest_path, lambda p: p.write_text(
+        json.dumps(manifest, indent=2), encoding="utf-8"))
+    return report
@@ -1,19 +1,195 @@
 """Storage module for saving and loading data."""
 
 import json
+import os
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional, Tuple
 from models.classes import Player, Tournament
+from models.history import TournamentHistory
+from utils import metrics
 
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locking, single process only
+    fcntl = None
 
-DATA_DIR = Path("data")
-PLAYERS_FILE = DATA_DIR / "players.json"
-TOURN_DIR = DATA_DIR / "tournaments"
 
-DATA_DIR.mkdir(exist_ok=True)
-TOURN_DIR.mkdir(exist_ok=True)
+DATA_DIR_ENV = "CHESS_DATA_DIR"
+LOCK_FILE_NAME = ".lock"
 
+_data_dir: Optional[Path] = None
+_seen_generations: Dict[str, Optional[Tuple[int, int, int]]] = {}
+_lock_state = threading.local()
+_thread_lock = threading.RLock()
 
+
+def set_data_dir(path) -> None:
+    """
+    Set the root directory used for all stored data.
+
+    Args:
+        path: Data directory (str or Path), or None to fall back to the
+            CHESS_DATA_DIR environment variable / "data"
+    """
+    global _data_dir
+    _data_dir = Path(path) if path is not None else None
+
+
+def get_data_dir() -> Path:
+    """
+    Get the root directory used for all stored data.
+
+    Returns:
+        Configured data directory, CHESS_DATA_DIR if set, "data" otherwise
+    """
+    if _data_dir is not None:
+        return _data_dir
+    return Path(os.environ.get(DATA_DIR_ENV, "data"))
+
+
+def get_players_file() -> Path:
+    """
+    Get the path of the players file.
+
+    Returns:
+        Path to players.json inside the data directory
+    """
+    return get_data_dir() / "players.json"
+
+
+def get_tournaments_dir() -> Path:
+    """
+    Get the directory holding tournament files.
+
+    Returns:
+        Path to the tournaments directory inside the data directory
+    """
+    return get_data_dir() / "tournaments"
+
+
+def _ensure_dirs() -> None:
+    """Create the data directories on first write."""
+    get_tournaments_dir().mkdir(parents=True, exist_ok=True)
+
+
+@contextmanager
+def storage_lock():
+    """
+    Hold the exclusive storage lock shared by all processes.
+
+    The lock is an fcntl advisory lock on data/.lock and is reentrant
+    within a thread, so a read-modify-write sequence can wrap the save
+    functions, which take the lock themselves.
+    """
+    with _thread_lock:
+        depth = getattr(_lock_state, "depth", 0)
+        if depth == 0:
+            _ensure_dirs()
+            _lock_state.fd = open(get_data_dir() / LOCK_FILE_NAME, "a")
+            if fcntl is not None:
+                fcntl.flock(_lock_state.fd.fileno(), fcntl.LOCK_EX)
+        _lock_state.depth = depth + 1
+        try:
+            yield
+        finally:
+            _lock_state.depth -= 1
+            if _lock_state.depth == 0:
+                if fcntl is not None:
+                    fcntl.flock(_lock_state.fd.fileno(), fcntl.LOCK_UN)
+                _lock_state.fd.close()
+                _lock_state.fd = None
+
+
+def _write_json(path: Path, data) -> None:
+    """
+    Atomically replace a JSON file under the storage lock.
+
+    Args:
+        path: Destination file
+        data: JSON-serialisable data
+    """
+    with storage_lock():
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        payload = json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+        tmp.write_bytes(payload)
+        os.replace(tmp, path)
+    if metrics.ENABLED:
+        metrics.count("storage.bytes_written", len(payload))
+
+
+def _read_json(path: Path):
+    """
+    Read a JSON file.
+
+    Args:
+        path: File to read
+
+    Returns:
+        Decoded JSON data
+    """
+    payload = path.read_bytes()
+    if metrics.ENABLED:
+        metrics.count("storage.bytes_read", len(payload))
+    return json.loads(payload)
+
+
+def get_generation(path: Path) -> Optional[Tuple[int, int, int]]:
+    """
+    Get a cheap change marker for a stored file.
+
+    Args:
+        path: File to inspect
+
+    Returns:
+        (inode, mtime_ns, size) tuple, or None if the file does not exist
+    """
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def get_players_generation() -> Optional[Tuple[int, int, int]]:
+    """
+    Get the change marker of the players file.
+
+    Returns:
+        Generation tuple, or None if the roster has never been saved
+    """
+    return get_generation(get_players_file())
+
+
+def tournament_file_name(tournament: Tournament) -> str:
+    """
+    Get the default file name of a tournament.
+
+    Args:
+        tournament: Tournament instance
+
+    Returns:
+        File name relative to the tournaments directory
+    """
+    safe_name = f"{tournament.name.replace(' ', '_')}_{tournament.start_date.replace('/', '-')}"
+    return f"{safe_name}.json"
+
+
+def get_tournament_generation(file_name: str) -> Optional[Tuple[int, int, int]]:
+    """
+    Get the change marker of a tournament file.
+
+    Args:
+        file_name: Name of the tournament file
+
+    Returns:
+        Generation tuple, or None if the file does not exist
+    """
+    return get_generation(get_tournaments_dir() / file_name)
+
+
+@metrics.timed("storage.load_players")
 def load_players() -> Dict[str, Player]:
     """
     Load all players from storage.
@@ -21,14 +197,15 @@ def load_players() -> Dict[str, Player]:
     Returns:
         Dictionary of Player instances keyed by national_id
     """
-    if not PLAYERS_FILE.exists():
-        PLAYERS_FILE.write_text("[]", encoding="utf-8")
-    with PLAYERS_FILE.open("r", encoding="utf-8") as f:
-        arr = json.load(f)
+    players_file = get_players_file()
+    if not players_file.exists():
+        return {}
+    arr = _read_json(players_file)
     players = {p["national_id"]: Player.from_dict(p) for p in arr}
     return players
 
 
+@metrics.timed("storage.save_players")
 def save_players(players: Dict[str, Player]) -> None:
     """
     Save players to storage.
@@ -37,10 +214,10 @@ def save_players(players: Dict[str, Player]) -> None:
         players: Dictionary of Player instances to save
     """
     arr = [p.to_dict() for p in players.values()]
-    with PLAYERS_FILE.open("w", encoding="utf-8") as f:
-        json.dump(arr, f, indent=2, ensure_ascii=False)
+    _write_json(get_players_file(), arr)
 
 
+@metrics.timed("storage.save_tournament")
 def save_tournament(tournament: Tournament, file_name: str = None) -> None:
     """
     Save tournament to storage.
@@ -50,14 +227,13 @@ def save_tournament(tournament: Tournament, file_name: str = None) -> None:
         file_name: Optional custom file name
     """
     if file_name is None:
-        safe_name = f"{tournament.name.replace(' ', '_')}_{tournament.start_date.replace('/', '-')}"
-        file_name = TOURN_DIR / f"{safe_name}.json"
-    else:
-        file_name = TOURN_DIR / file_name
-    with file_name.open("w", encoding="utf-8") as f:
-        json.dump(tournament.to_dict(), f, indent=2, ensure_ascii=False)
+        file_name = tournament_file_name(tournament)
+    with storage_lock():
+        _write_json(get_tournaments_dir() / file_name, tournament.to_dict())
+        _seen_generations[file_name] = get_tournament_generation(file_name)
 
 
+@metrics.timed("storage.load_tournament")
 def load_tournament(file_path: str) -> Tournament:
     """
     Load a tournament from storage.
@@ -68,12 +244,34 @@ def load_tournament(file_path: str) -> Tournament:
     Returns:
         Tournament instance
     """
-    p = TOURN_DIR / file_path
-    with p.open("r", encoding="utf-8") as f:
-        d = json.load(f)
+    p = get_tournaments_dir() / file_path
+    generation = get_generation(p)
+    d = _read_json(p)
+    _seen_generations[file_path] = generation
     return Tournament.from_dict(d)
 
 
+def refresh_tournament(tournament: Tournament) -> bool:
+    """
+    Reload a tournament in place if another process saved it since this
+    process last loaded or saved it.
+
+    Args:
+        tournament: Tournament instance to refresh
+
+    Returns:
+        True if the tournament was reloaded, False if it was up to date
+    """
+    file_name = tournament_file_name(tournament)
+    if file_name not in _seen_generations:
+        return False
+    if get_tournament_generation(file_name) == _seen_generations[file_name]:
+        return False
+    fresh = load_tournament(file_name)
+    tournament.__dict__.update(fresh.__dict__)
+    return True
+
+
 def list_tournament_files() -> list:
     """
     List all available tournament files.
@@ -81,4 +279,161 @@ def list_tournament_files() -> list:
     Returns:
         List of tournament file names
     """
-    return [p.name for p in TOURN_DIR.glob("*.json")]
+    tourn_dir = get_tournaments_dir()
+    if not tourn_dir.is_dir():
+        return []
+    return [p.name for p in tourn_dir.glob("*.json")]
+
+
+def get_history_dir() -> Path:
+    """
+    Get the directory holding undo/redo histories.
+
+    Returns:
+        Path to the history directory inside the data directory
+    """
+    return get_data_dir() / "history"
+
+
+def _history_folder(file_name: str) -> Path:
+    """Get the folder holding one tournament's history."""
+    return get_history_dir() / Path(file_name).stem
+
+
+def get_history_generation(file_name: str) -> Optional[Tuple[int, int, int]]:
+    """
+    Get the change marker of a tournament's history.
+
+    Args:
+        file_name: Name of the tournament file
+
+    Returns:
+        Generation tuple, or None if there is no history
+    """
+    return get_generation(_history_folder(file_name) / "index.json")
+
+
+@metrics.timed("storage.save_history")
+def save_history(file_name: str, history: TournamentHistory) -> None:
+    """
+    Save the undo/redo history of a tournament.
+
+    Rounds and player lists are stored once each under objects/, named by
+    their content, so a save only writes the objects that are new and the
+    small index; objects no longer referenced are removed.
+
+    Args:
+        file_name: Name of the tournament file
+        history: TournamentHistory instance
+    """
+    folder = _history_folder(file_name)
+    objects_dir = folder / "objects"
+    with storage_lock():
+        objects_dir.mkdir(parents=True, exist_ok=True)
+        index, objects = history.export()
+        stored = {p.stem for p in objects_dir.glob("*.json")}
+        for key, obj in objects.items():
+            if key not in stored:
+                _write_json(objects_dir / f"{key}.json",
+                            history.encode_object(obj))
+        _write_json(folder / "index.json", index)
+        for key in stored - set(objects):
+            (objects_dir / f"{key}.json").unlink(missing_ok=True)
+
+
+def load_history(file_name: str) -> Optional[TournamentHistory]:
+    """
+    Load the undo/redo history of a tournament.
+
+    Args:
+        file_name: Name of the tournament file
+
+    Returns:
+        TournamentHistory instance, or None if there is none
+    """
+    folder = _history_folder(file_name)
+    if not (folder / "index.json").exists():
+        return None
+    with storage_lock():
+        return TournamentHistory.from_index(
+            _read_json(folder / "index.json"),
+            lambda key: _read_json(folder / "objects" / f"{key}.json"))
+
+
+def get_journal_dir() -> Path:
+    """
+    Get the directory holding result-entry journals.
+
+    Returns:
+        Path to the journal directory inside the data directory
+    """
+    return get_data_dir() / "journal"
+
+
+def journal_name(file_name: str, round_index: int,
+                 section_name: Optional[str] = None) -> str:
+    """
+    Get the journal file name of a round being entered.
+
+    Args:
+        file_name: Name of the tournament file
+        round_index: Index of the round
+        section_name: Section of the round (None for a flat tournament)
+
+    Returns:
+        Journal file name
+    """
+    section = f"_{section_name.replace(' ', '_')}" if section_name else ""
+    return f"{Path(file_name).stem}{section}_round{round_index}.jsonl"
+
+
+def append_journal(name: str, entry) -> None:
+    """
+    Append one entry to a journal and flush it to disk.
+
+    Args:
+        name: Journal file name
+        entry: JSON-serialisable entry
+    """
+    get_journal_dir().mkdir(parents=True, exist_ok=True)
+    line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+    with open(get_journal_dir() / name, "ab") as f:
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+    if metrics.ENABLED:
+        metrics.count("storage.bytes_written", len(line))
+
+
+def load_journal(name: str) -> list:
+    """
+    Load the entries of a journal.
+
+    A last line cut short by a crash is ignored.
+
+    Args:
+        name: Journal file name
+
+    Returns:
+        List of entries (empty if there is no journal)
+    """
+    path = get_journal_dir() / name
+    if not path.exists():
+        return []
+    entries = []
+    for line in path.read_bytes().splitlines():
+        try:
+            entries.append(json.loads(line))
+        except ValueError:
+            break
+    return entries
+
+
+def clear_journal(name: str) -> None:
+    """
+    Delete a journal once its entries are saved.
+
+    Args:
+        name: Journal file name
+    """
+    (get_journal_dir() / name).unlink(missing_ok=True)
@@ -0,0 +1,223 @@
+"""Integrity check of the stored roster and tournament files."""
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import FrozenSet, List, Optional
+from storage.save import get_players_file, get_tournaments_dir
+from utils import metrics
+
+
+BYE = "BYE"
+# Score pairs a finished game may hold; (None, None) is an unplayed game.
+LEGAL_SCORES = {(1.0, 0.0), (0.0, 1.0), (0.5, 0.5), (None, None)}
+# Below this many tournament files a single process is faster than a pool.
+PARALLEL_MIN_FILES = 200
+# Tournament files sent to a worker at a time.
+CHUNK_FILES = 64
+
+_roster: FrozenSet[str] = frozenset()
+
+
+def _violation(file_name: str, location: str, message: str) -> dict:
+    """Build one violation entry."""
+    return {"file": file_name, "location": location, "message": message}
+
+
+def verify_roster(path: Path) -> tuple:
+    """
+    Check the roster file.
+
+    Args:
+        path: Path to players.json
+
+    Returns:
+        (set of national IDs found, list of violations)
+    """
+    if not path.exists():
+        return set(), []
+    try:
+        entries = json.loads(path.read_bytes())
+    except (OSError, ValueError) as e:
+        return set(), [_violation(path.name, "", f"Unreadable file: {e}")]
+    if not isinstance(entries, list):
+        return set(), [_violation(path.name, "", "Expected a list of players.")]
+    ids, violations = {}, []
+    for i, entry in enumerate(entries):
+        nid = entry.get("national_id") if isinstance(entry, dict) else None
+        if not nid:
+            violations.append(_violation(path.name, f"[{i}]",
+                                         "Player without national_id."))
+        elif nid in ids:
+            violations.append(_violation(
+                path.name, f"[{i}]",
+                f"Duplicate national_id {nid} (first at [{ids[nid]}])."))
+        else:
+            ids[nid] = i
+    return set(ids), violations
+
+
+def _check_pool(file_name: str, prefix: str, pool: dict,
+                registered: Optional[set], violations: List[dict]) -> None:
+    """
+    Check the players and rounds of a tournament or section.
+
+    Args:
+        file_name: Tournament file name
+        prefix: Location of the pool in the file ("" or "sections[name].")
+        pool: Stored tournament or section dictionary
+        registered: Players a section may contain (None for a tournament)
+        violations: List the violations are appended to
+    """
+    players = pool.get("players", [])
+    seen = set()
+    for i, pid in enumerate(players):
+        where = f"{prefix}players[{i}]"
+        if pid in seen:
+            violations.append(_violation(file_name, where,
+                                         f"{pid} is listed twice."))
+        seen.add(pid)
+        if pid not in _roster:
+            violations.append(_violation(file_name, where,
+                                         f"{pid} is not in the roster."))
+        elif registered is not None and pid not in registered:
+            violations.append(_violation(
+                file_name, where, f"{pid} is not registered to the tournament."))
+    rounds = pool.get("rounds", [])
+    # A tournament split into sections follows its sections' rounds.
+    if not pool.get("sections") and pool.get("current_round") != len(rounds):
+        violations.append(_violation(
+            file_name, f"{prefix}current_round",
+            f"current_round is {pool.get('current_round')} but there are "
+            f"{len(rounds)} rounds."))
+    num_rounds = pool.get("num_rounds")
+    if isinstance(num_rounds, int) and len(rounds) > num_rounds:
+        violations.append(_violation(
+            file_name, f"{prefix}rounds",
+            f"{len(rounds)} rounds for a {num_rounds}-round event."))
+    for ri, rnd in enumerate(rounds):
+        paired = set()
+        for gi, game in enumerate(rnd.get("games", [])):
+            where = f"{prefix}rounds[{ri}].games[{gi}]"
+            try:
+                (p1, s1), (p2, s2) = game["player1"], game["player2"]
+            except (KeyError, TypeError, ValueError):
+                violations.append(_violation(file_name, where,
+                                             "Malformed game."))
+                continue
+            for pid in (p1, p2):
+                if pid == BYE:
+                    continue
+                if pid not in seen:
+                    violations.append(_violation(
+                        file_name, where, f"{pid} is not a player of the pool."))
+                if pid in paired:
+                    violations.append(_violation(
+                        file_name, where, f"{pid} plays twice in the round."))
+                paired.add(pid)
+            if p2 == BYE or p1 == BYE:
+                legal = (p2 == BYE and (s1, s2) == (1.0, 0.0)) or \
+                        (p1 == BYE and (s1, s2) == (0.0, 1.0))
+            else:
+                legal = (s1, s2) in LEGAL_SCORES
+            if not legal:
+                violations.append(_violation(
+                    file_name, where,
+                    f"Illegal score {s1}-{s2} for {p1} vs {p2}."))
+
+
+def verify_tournament_file(path: str) -> List[dict]:
+    """
+    Check one tournament file against the roster.
+
+    Args:
+        path: Path to the tournament file
+
+    Returns:
+        List of violations
+    """
+    file_name = Path(path).name
+    try:
+        data = json.loads(Path(path).read_bytes())
+        sections = data.get("sections", [])
+    except (OSError, ValueError, AttributeError) as e:
+        return [_violation(file_name, "", f"Unreadable file: {e}")]
+    violations = []
+    try:
+        _check_pool(file_name, "", data, None, violations)
+        registered = set(data.get("players", []))
+        owner = {}
+        for section in sections:
+            name = section.get("name")
+            prefix = f"sections[{name}]."
+            _check_pool(file_name, prefix, section, registered, violations)
+            for pid in section.get("players", []):
+                if owner.setdefault(pid, name) != name:
+                    violations.append(_violation(
+                        file_name, f"{prefix}players",
+                        f"{pid} is also in section {owner[pid]}."))
+        if sections:
+            expected = max(s.get("current_round", 0) for s in sections)
+            if data.get("current_round") != expected:
+                violations.append(_violation(
+                    file_name, "current_round",
+                    f"current_round is {data.get('current_round')} but the "
+                    f"most advanced section is at {expected}."))
+    except (AttributeError, TypeError) as e:
+        violations.append(_violation(file_name, "",
+                                     f"Unexpected structure: {e}"))
+    return violations
+
+
+def _init_worker(roster: FrozenSet[str]) -> None:
+    """Receive the roster once per worker process."""
+    global _roster
+    _roster = roster
+
+
+def _verify_chunk(paths: List[str]) -> List[dict]:
+    """Check a chunk of tournament files (runs in a worker process)."""
+    violations = []
+    for path in paths:
+        violations.extend(verify_tournament_file(path))
+    return violations
+
+
+@metrics.timed("verify.archive")
+def verify_archive(max_workers: Optional[int] = None) -> List[dict]:
+    """
+    Check the roster and every tournament file.
+
+    The roster is checked first; tournament files are then checked in
+    chunks on a process pool when there are enough of them. Every
+    violation is reported, not only the first one.
+
+    Args:
+        max_workers: Number of worker processes (default: CPU count)
+
+    Returns:
+        List of violations, each a dictionary with the "file", the
+        "location" inside the file and a "message"; roster violations
+        first, then tournament files in name order
+    """
+    global _roster
+    # Files are replaced atomically, so each one is read whole without
+    # holding the storage lock against other terminals.
+    ids, violations = verify_roster(get_players_file())
+    tourn_dir = get_tournaments_dir()
+    paths = sorted(str(p) for p in tourn_dir.glob("*.json")) \
+        if tourn_dir.is_dir() else []
+    roster = frozenset(ids)
+    chunks = [paths[i:i + CHUNK_FILES]
+              for i in range(0, len(paths), CHUNK_FILES)]
+    if len(paths) >= PARALLEL_MIN_FILES:
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 initializer=_init_worker,
+                                 initargs=(roster,)) as executor:
+            results = list(executor.map(_verify_chunk, chunks))
+    else:
+        _roster = roster
+        results = [_verify_chunk(chunk) for chunk in chunks]
+    for result in results:
+        violations.extend(result)
+    return violations
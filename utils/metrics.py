@@ -0,0 +1,142 @@
+"""Lightweight timing and counter instrumentation.
+
+Enabled with the CHESS_METRICS environment variable (or ``main.py
+--metrics``). When disabled, ``timed`` returns the function unchanged and
+callers guard counters with ``ENABLED``, so instrumentation costs nothing.
+"""
+
+import atexit
+import functools
+import json
+import math
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+METRICS_ENV = "CHESS_METRICS"
+METRICS_FILE_ENV = "CHESS_METRICS_FILE"
+
+ENABLED = os.environ.get(METRICS_ENV, "") not in ("", "0")
+
+_timings: Dict[str, List[float]] = {}
+_counters: Dict[str, int] = {}
+
+
+def timed(name: str):
+    """
+    Decorate a function so each call is recorded under ``name``.
+
+    Args:
+        name: Operation name used in the report
+
+    Returns:
+        Decorator; the identity when metrics are disabled
+    """
+    def decorator(func):
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def record(name: str, seconds: float) -> None:
+    """
+    Record one latency sample.
+
+    Args:
+        name: Operation name
+        seconds: Duration in seconds
+    """
+    _timings.setdefault(name, []).append(seconds)
+
+
+def count(name: str, amount: int = 1) -> None:
+    """
+    Increment a counter (calls, bytes read/written...).
+
+    Args:
+        name: Counter name
+        amount: Value to add
+    """
+    _counters[name] = _counters.get(name, 0) + amount
+
+
+def _percentile(sorted_samples: List[float], pct: float) -> float:
+    """Return the nearest-rank percentile of sorted samples."""
+    idx = max(0, math.ceil(pct / 100 * len(sorted_samples)) - 1)
+    return sorted_samples[idx]
+
+
+def _histogram(samples: List[float]) -> Dict[str, int]:
+    """Bucket samples by powers of two microseconds."""
+    buckets: Dict[str, int] = {}
+    for s in samples:
+        upper = 1 << max(0, math.ceil(math.log2(max(s * 1e6, 1))))
+        key = f"<={upper}us"
+        buckets[key] = buckets.get(key, 0) + 1
+    return dict(sorted(buckets.items(), key=lambda kv: int(kv[0][2:-2])))
+
+
+def snapshot() -> dict:
+    """
+    Build a report of all metrics collected so far.
+
+    Returns:
+        Dictionary with per-operation latency stats and counters
+    """
+    operations = {}
+    for name, samples in _timings.items():
+        ordered = sorted(samples)
+        operations[name] = {
+            "calls": len(ordered),
+            "total_ms": sum(ordered) * 1000,
+            "min_ms": ordered[0] * 1000,
+            "p50_ms": _percentile(ordered, 50) * 1000,
+            "p95_ms": _percentile(ordered, 95) * 1000,
+            "p99_ms": _percentile(ordered, 99) * 1000,
+            "max_ms": ordered[-1] * 1000,
+            "histogram": _histogram(ordered),
+        }
+    return {"operations": operations, "counters": dict(_counters)}
+
+
+def reset() -> None:
+    """Discard all collected metrics."""
+    _timings.clear()
+    _counters.clear()
+
+
+def dump(file_path: Optional[str] = None) -> None:
+    """
+    Write the metrics report.
+
+    Args:
+        file_path: JSON file to write; a summary is printed to stderr if None
+    """
+    report = snapshot()
+    if file_path:
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        return
+    ops = sorted(report["operations"].items(),
+                 key=lambda kv: -kv[1]["total_ms"])
+    for name, st in ops:
+        print(f"[metrics] {name}: {st['calls']} appels, "
+              f"total {st['total_ms']:.2f} ms, p50 {st['p50_ms']:.3f} ms, "
+              f"p95 {st['p95_ms']:.3f} ms, max {st['max_ms']:.3f} ms",
+              file=sys.stderr)
+    for name, value in sorted(report["counters"].items()):
+        print(f"[metrics] {name}: {value}", file=sys.stderr)
+
+
+if ENABLED:
+    atexit.register(dump, os.environ.get(METRICS_FILE_ENV))
@@ -39,6 +39,8 @@ class MainView:
         print("5) Charger un tournoi")
         print("6) Quitter")
         print("7) Lancer un tournoi")
+        print("8) Exporter les parties (CSV/Parquet)")
+        print("9) Vérifier l'intégrité des données")
 
     def print_tournament_menu(self, tournament: Tournament):
         """
@@ -56,6 +58,11 @@ class MainView:
         print("5) Entrer résultats pour un round")
         print("6) Points cumulés")
         print("7) Sauvegarder et revenir")
+        print("8) Ajouter une section")
+        print("9) Projection du classement final")
+        print("10) Annuler la dernière modification")
+        print("11) Rétablir la modification annulée")
+        print("12) Revenir à un round précédent")
 
     def display_players(self, players: dict):
         """
@@ -106,3 +113,51 @@ class MainView:
         points = self.tournament_controller.compute_tournament_points(tournament)
         for pid, pt in sorted(points.items(), key=lambda x: (-x[1], x[0])):
             print(f"{pid}: {pt}")
+
+    def display_section_standings(self, name: str, points: dict):
+        """
+        Display cumulative points of one section.
+
+        Args:
+            name: Section name
+            points: Dictionary mapping player IDs to their points
+        """
+        print(f"== Section {name} ==")
+        for pid, pt in sorted(points.items(), key=lambda x: (-x[1], x[0])):
+            print(f"{pid}: {pt}")
+
+    def display_projection(self, projection: dict):
+        """
+        Display simulated win and prize probabilities.
+
+        Args:
+            projection: Dictionary mapping player IDs to their win and
+                prize probabilities and expected points
+        """
+        rows = sorted(projection.items(),
+                      key=lambda x: (-x[1]["win"], -x[1]["prize"], x[0]))
+        for pid, p in rows:
+            print(f"{pid}: victoire {p['win']:.1%} - prix {p['prize']:.1%} "
+                  f"- points attendus {p['points']:.2f}")
+
+    def print_result_entry_help(self):
+        """Display the result codes of the quick entry."""
+        print("Codes: 1-0 (ou 1), 0-1 (ou 0), ½ (ou =). Plusieurs codes par "
+              "ligne remplissent les échiquiers suivants.")
+        print("N:code corrige l'échiquier N, Entrée passe l'échiquier, "
+              "v valide, p interrompt (reprise plus tard), a abandonne.")
+
+    def display_violations(self, violations: list):
+        """
+        Display the problems found by the integrity check.
+
+        Args:
+            violations: List of dictionaries with file, location and message
+        """
+        if not violations:
+            print("Aucun problème détecté.")
+            return
+        for v in violations:
+            where = f"{v['file']} {v['location']}".strip()
+            print(f"{where}: {v['message']}")
+        print(f"{len(violations)} problème(s) détecté(s).")